@@ -0,0 +1,368 @@
+"""
+Countdown timer model
+Deadline-based countdown state on the monotonic clock, without any GTK or cairo imports
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+
+TIMERS_FILE = os.path.expanduser('~/.config/countdown_timers.json')
+STATE_FILE = os.path.expanduser('~/.config/countdown_timers_state.json')
+DEFAULT_TIMERS = [{'name': "Timer", 'seconds': 0}]
+DURATION = re.compile(r'(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?')
+TICK_SLACK_MS = 5  # Wake this long after a displayed second changes
+
+
+class Countdown:
+    """A countdown that stores its expiry time instead of counting ticks
+
+    While running only the monotonic deadline is kept, so late wakeups never
+    accumulate: the remaining time is always derived from the clock. Every
+    method takes `now` from time.monotonic().
+    """
+
+    def __init__(self, total_seconds=0, name="Timer", action=None):
+        self.name = name
+        self.action = action  # Shell command run on expiry, None for a notification
+        self.total_seconds = total_seconds  # Total time set
+        self.deadline = None  # Monotonic expiry time while running
+        self.stopped_remaining = total_seconds  # Remaining time while paused or reset
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def remaining(self, now):
+        """Get the exact remaining time in seconds"""
+        if self.deadline is None:
+            return self.stopped_remaining
+        return max(0.0, self.deadline - now)
+
+    def display_seconds(self, now):
+        """Get the whole seconds to show, 25:00 until a full second has passed"""
+        return math.ceil(self.remaining(now))
+
+    def next_change_in(self, now):
+        """Get the time until the displayed second changes"""
+        remaining = self.remaining(now)
+        if remaining <= 0:
+            return 0.0
+        return remaining - (math.ceil(remaining) - 1)
+
+    def expired(self, now):
+        return self.deadline is not None and now >= self.deadline
+
+    def set_total(self, seconds):
+        """Set a new time, stopped"""
+        self.total_seconds = seconds
+        self.reset()
+
+    def start(self, now):
+        if self.deadline is None and self.stopped_remaining > 0:
+            self.deadline = now + self.stopped_remaining
+
+    def pause(self, now):
+        if self.deadline is not None:
+            self.stopped_remaining = self.remaining(now)
+            self.deadline = None
+
+    def reset(self):
+        self.deadline = None
+        self.stopped_remaining = self.total_seconds
+
+    def finish(self):
+        """Stop at zero after the deadline passed"""
+        self.deadline = None
+        self.stopped_remaining = 0
+
+
+class TimerSet:
+    """Named countdowns sharing one heap of deadlines
+
+    Running timers push (deadline, name) onto the heap. Entries are not
+    removed on pause or reset; an entry whose deadline no longer matches its
+    timer is stale and skipped when it reaches the top, so every operation
+    stays O(log n) and the host needs a single wakeup for the nearest expiry.
+    """
+
+    def __init__(self, timers=()):
+        self.timers = {}  # {name: Countdown}, in insertion order
+        self.heap = []
+        for countdown in timers:
+            self.timers[countdown.name] = countdown
+
+    def __len__(self):
+        return len(self.timers)
+
+    def __iter__(self):
+        return iter(self.timers.values())
+
+    def get(self, name):
+        return self.timers.get(name)
+
+    def add(self, name, seconds=0, action=None):
+        """Add a timer, or set the time of an existing one"""
+        countdown = self.timers.get(name)
+        if countdown is None:
+            countdown = self.timers[name] = Countdown(seconds, name, action)
+        else:
+            countdown.set_total(seconds)
+        return countdown
+
+    def remove(self, name):
+        self.timers.pop(name, None)
+
+    def start(self, name, now):
+        countdown = self.timers[name]
+        countdown.start(now)
+        if countdown.running:
+            heapq.heappush(self.heap, (countdown.deadline, name))
+
+    def pause(self, name, now):
+        self.timers[name].pause(now)
+
+    def reset(self, name):
+        self.timers[name].reset()
+
+    def drop_stale(self):
+        while self.heap:
+            deadline, name = self.heap[0]
+            countdown = self.timers.get(name)
+            if countdown is not None and countdown.deadline == deadline:
+                return
+            heapq.heappop(self.heap)
+
+    def next_deadline(self):
+        """Get the nearest deadline of any running timer, or None"""
+        self.drop_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def expire_due(self, now):
+        """Finish every timer whose deadline passed, return them"""
+        expired = []
+        self.drop_stale()
+        while self.heap and self.heap[0][0] <= now:
+            _, name = heapq.heappop(self.heap)
+            countdown = self.timers[name]
+            countdown.finish()
+            expired.append(countdown)
+            self.drop_stale()
+        return expired
+
+    def next_change_in(self, now, names=None):
+        """Get the time until the display of any running timer (or of `names`) changes"""
+        changes = [countdown.next_change_in(now) for countdown in self.timers.values()
+                   if countdown.running and (names is None or countdown.name in names)]
+        return min(changes) if changes else None
+
+
+class Ticker:
+    """The single wakeup serving every timer of a TimerSet
+
+    Time is only read from `clock` and wakeups only go through `scheduler`,
+    which has GLib's timeout_add, timeout_add_seconds and source_remove; the
+    widget passes the GLib module itself, countdown_bench.py a simulated
+    main loop. `shown` returns the names of the timers whose time is on
+    screen, and on_tick(expired) is called after every wakeup.
+    """
+
+    def __init__(self, timers, scheduler, clock=time.monotonic, shown=None, on_tick=None):
+        self.timers = timers
+        self.scheduler = scheduler
+        self.clock = clock
+        self.shown = shown or (lambda: None)
+        self.on_tick = on_tick
+        self.obscured = False  # Nothing to show while covered, only expiry matters
+        self.source_id = None
+        self.wakeups = 0
+
+    def cancel(self):
+        if self.source_id:
+            self.scheduler.source_remove(self.source_id)
+            self.source_id = None
+
+    def schedule(self):
+        """Arm the wakeup for the nearest expiry or shown second change
+
+        Deadlines are fixed, so a late wakeup only delays one update. While
+        the window is covered only expiries matter, and long waits are left
+        to the coarse, coalesced seconds timer.
+        """
+        self.cancel()
+        now = self.clock()
+        deadline = self.timers.next_deadline()
+        if deadline is None:
+            return
+
+        delay = deadline - now
+        if self.obscured:
+            if delay > 2:
+                self.source_id = self.scheduler.timeout_add_seconds(int(delay) - 1, self.tick)
+                return
+        else:
+            change = self.timers.next_change_in(now, self.shown())
+            if change is not None:
+                delay = min(delay, change)
+        self.source_id = self.scheduler.timeout_add(
+            math.ceil(max(delay, 0) * 1000) + TICK_SLACK_MS, self.tick)
+
+    def tick(self):
+        """Finish expired timers and re-arm from the deadlines"""
+        self.source_id = None
+        self.wakeups += 1
+        expired = self.timers.expire_due(self.clock())
+        self.schedule()
+        if self.on_tick:
+            self.on_tick(expired)
+        return False
+
+
+def parse_duration(text):
+    """Parse "25m", "90s", "1h30m", "1:30" (minutes:seconds) or "25" (minutes) into seconds"""
+    text = text.strip().lower()
+    if ':' in text:
+        minutes, _, seconds = text.partition(':')
+        return int(minutes or 0) * 60 + int(seconds or 0)
+    if text.isdigit():
+        return int(text) * 60
+
+    match = DURATION.fullmatch(text)
+    if not match or not any(match.groups()):
+        raise ValueError(f"Invalid duration: {text}")
+    hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def load_timers(path=None):
+    """Read the configured timers, e.g. {"timers": [{"name": "tea", "seconds": 180, "action": "..."}]}"""
+    entries = DEFAULT_TIMERS
+    try:
+        with open(path or TIMERS_FILE) as f:
+            data = json.load(f)
+        if isinstance(data.get('timers'), list) and data['timers']:
+            entries = data['timers']
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Error loading timers: {e}", file=sys.stderr)
+
+    timers = TimerSet()
+    for entry in entries:
+        if not (isinstance(entry, dict) and entry.get('name')):
+            print(f"Skipping timer without a name: {entry!r}", file=sys.stderr)
+            continue
+        try:
+            seconds = int(entry.get('seconds', 0))
+        except (ValueError, TypeError):
+            print(f"Skipping timer {entry['name']!r} with bad seconds: {entry.get('seconds')!r}",
+                  file=sys.stderr)
+            continue
+        timers.add(str(entry['name']), max(0, seconds), entry.get('action'))
+    if not timers:
+        # Hosts always show a selected timer, so never hand them an empty set
+        print("No valid timers configured, using the default", file=sys.stderr)
+        for entry in DEFAULT_TIMERS:
+            timers.add(entry['name'], entry['seconds'])
+    return timers
+
+
+def save_state(timers, selected, path=None):
+    """Write every timer and the selection atomically, running ones by wall-clock deadline
+
+    Only called on transitions: a running timer is fully described by its
+    deadline, so nothing has to be written while it counts down.
+    """
+    now = time.monotonic()
+    wall = time.time()
+    entries = []
+    for countdown in timers:
+        entry = {
+            'name': countdown.name,
+            'total': countdown.total_seconds,
+            'remaining': countdown.stopped_remaining,
+        }
+        if countdown.action:
+            entry['action'] = countdown.action
+        if countdown.running:
+            entry['deadline'] = round(wall + countdown.deadline - now, 3)
+        entries.append(entry)
+
+    path = path or STATE_FILE
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write a temp file and rename it so a crash never leaves a partial file
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'selected': selected, 'timers': entries}, f)
+        os.replace(tmp_file, path)
+    except OSError as e:
+        print(f"Error saving timer state: {e}", file=sys.stderr)
+
+
+def restore_state(timers, path=None):
+    """Continue the timers saved by save_state(), return (selected, expired)
+
+    Timers whose deadline passed while nothing was running are finished and
+    returned, so the host can still run their missed actions. `selected` is
+    None unless the saved selection still exists.
+    """
+    try:
+        with open(path or STATE_FILE) as f:
+            data = json.load(f)
+        entries = list(data.get('timers', []))
+    except FileNotFoundError:
+        return None, []
+    except (OSError, ValueError, AttributeError, TypeError) as e:
+        print(f"Error loading timer state: {e}", file=sys.stderr)
+        return None, []
+
+    now = time.monotonic()
+    wall = time.time()
+    expired = []
+    for entry in entries:
+        # Parse the whole entry first, so a bad field leaves the timers untouched
+        try:
+            name = str(entry['name'])
+            total = max(0, int(entry['total']))
+            stopped_remaining = max(0.0, float(entry['remaining']))
+            deadline = entry.get('deadline')
+            if deadline is not None:
+                deadline = float(deadline)
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            print(f"Skipping saved timer {entry!r}: {e}", file=sys.stderr)
+            continue
+
+        existing = timers.get(name)
+        # The configured action wins over the saved one
+        action = existing.action if existing else entry.get('action')
+        countdown = timers.add(name, total, action)
+        countdown.stopped_remaining = stopped_remaining
+        if deadline is not None:
+            remaining = deadline - wall
+            if remaining <= 0:
+                countdown.finish()
+                expired.append(countdown)
+            else:
+                countdown.stopped_remaining = remaining
+                timers.start(name, now)
+
+    selected = data.get('selected')
+    if not isinstance(selected, str) or timers.get(selected) is None:
+        selected = None
+    return selected, expired
+
+
+def run_action(countdown):
+    """Run a finished timer's action, by default a desktop notification"""
+    command = countdown.action or ['notify-send', "Timer finished", f"{countdown.name} is done"]
+    try:
+        subprocess.Popen(command, shell=isinstance(command, str), start_new_session=True,
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+    except OSError as e:
+        print(f"Error running timer action: {e}", file=sys.stderr)
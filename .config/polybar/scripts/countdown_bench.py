@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Countdown timer simulation
+Runs hours of countdowns on a simulated main loop with artificial latency, no GTK needed
+
+Reports how late each displayed second appeared, how far expiries landed
+from their deadline and how many wakeups it took, for the Ticker the widget
+uses and for the old one-second repeating timeout as a baseline.
+
+Usage:
+    countdown_bench.py [--hours 3] [--latency 0 5 50] [-o results.json] [--check]
+"""
+
+import argparse
+import datetime
+import heapq
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+
+from countdown import TICK_SLACK_MS, Ticker, TimerSet
+
+LATENCIES_MS = (0, 5, 50)
+START = 1000.0  # Virtual monotonic time the simulations start at
+
+
+class SimulatedLoop:
+    """A virtual clock with GLib's timeout_add, timeout_add_seconds and source_remove
+
+    Every dispatch is delayed by a random latency of up to twice
+    `latency_ms`, as on a busy main loop. Callbacks returning True are
+    re-armed from the time they ran, like GLib does. call_at() runs user
+    input at an exact time.
+    """
+
+    def __init__(self, latency_ms, seed=0):
+        self.now = START
+        self.latency = latency_ms / 1000
+        self.rng = random.Random(seed)
+        self.queue = []  # Heap of (due, source id, interval, coalesce, callback)
+        self.cancelled = set()
+        self.next_id = 1
+
+    def clock(self):
+        return self.now
+
+    def push(self, interval, coalesce, callback, source_id=None):
+        if source_id is None:
+            source_id = self.next_id
+            self.next_id += 1
+        due = self.now + interval
+        if coalesce:
+            # Seconds timers fire on whole-second boundaries, shared with other sources
+            due = math.ceil(due)
+        heapq.heappush(self.queue, (due + self.rng.uniform(0, 2 * self.latency),
+                                    source_id, interval, coalesce, callback))
+        return source_id
+
+    def timeout_add(self, interval_ms, callback):
+        return self.push(interval_ms / 1000, False, callback)
+
+    def timeout_add_seconds(self, interval, callback):
+        return self.push(interval, True, callback)
+
+    def source_remove(self, source_id):
+        self.cancelled.add(source_id)
+
+    def call_at(self, when, callback):
+        """Run callback at exactly `when`, without latency"""
+        heapq.heappush(self.queue, (when, 0, None, False, callback))
+
+    def run_until(self, end):
+        while self.queue and self.queue[0][0] <= end:
+            due, source_id, interval, coalesce, callback = heapq.heappop(self.queue)
+            if source_id in self.cancelled:
+                self.cancelled.discard(source_id)
+                continue
+            self.now = max(self.now, due)
+            if callback() and interval is not None:
+                self.push(interval, coalesce, callback, source_id)
+        self.now = max(self.now, end)
+
+
+class Recorder:
+    """Checks every update of one shown timer against its exact deadline
+
+    `deadline` is kept by the scenario from its own arithmetic, independent
+    of the Countdown being checked.
+    """
+
+    def __init__(self, loop, countdown):
+        self.loop = loop
+        self.countdown = countdown
+        self.deadline = None
+        self.shown = countdown.display_seconds(loop.now)
+        self.late = []
+        self.skipped = 0
+        self.expiries = []  # (time, deadline) of every expiry reported
+
+    def on_tick(self, expired):
+        now = self.loop.now
+        shown = self.countdown.display_seconds(now)
+        if shown != self.shown and self.deadline is not None:
+            # The shown second began when the remaining time reached it
+            self.late.append(now - (self.deadline - shown))
+            self.skipped += max(0, self.shown - shown - 1)
+        self.shown = shown
+        if self.countdown in expired:
+            self.expiries.append((now, self.deadline))
+
+
+def summarize(loop_wakeups, recorder, error=None):
+    """Collect the metrics of one run in ms"""
+    late = recorder.late or [0.0]
+    if error is None:
+        error = max((abs(at - deadline) for at, deadline in recorder.expiries), default=math.nan)
+    return {
+        'wakeups': loop_wakeups,
+        'updates': len(recorder.late),
+        'mean_late_ms': statistics.fmean(late) * 1000,
+        'max_late_ms': max(late) * 1000,
+        'skipped_seconds': recorder.skipped,
+        'expiry_error_ms': error * 1000,
+        'expiries': len(recorder.expiries),
+    }
+
+
+def make_ticker(loop, seconds, names=('Timer',), shown=None):
+    timers = TimerSet()
+    for name in names:
+        timers.add(name, seconds)
+    recorder = Recorder(loop, timers.get(names[0]))
+    shown_names = list(names[:1]) if shown is None else shown
+    ticker = Ticker(timers, loop, loop.clock, lambda: shown_names, recorder.on_tick)
+    return timers, ticker, recorder
+
+
+def start(loop, timers, ticker, recorder, name='Timer'):
+    timers.start(name, loop.now)
+    if name == recorder.countdown.name:
+        # The host redraws on every transition
+        recorder.deadline = loop.now + recorder.countdown.remaining(loop.now)
+        recorder.shown = recorder.countdown.display_seconds(loop.now)
+    ticker.schedule()
+
+
+def run_countdown(latency_ms, seconds, obscured=False):
+    """One long countdown, on screen or covered"""
+    loop = SimulatedLoop(latency_ms)
+    timers, ticker, recorder = make_ticker(loop, seconds)
+    ticker.obscured = obscured
+    start(loop, timers, ticker, recorder)
+    loop.run_until(START + seconds + 5)
+    return summarize(ticker.wakeups, recorder)
+
+
+def run_pause_resume(latency_ms, seconds, seed=1):
+    """A countdown paused for a few minutes every quarter of an hour or so"""
+    loop = SimulatedLoop(latency_ms, seed)
+    rng = random.Random(seed)
+    timers, ticker, recorder = make_ticker(loop, seconds)
+    start(loop, timers, ticker, recorder)
+
+    # Remaining time expected at each pause, from the schedule alone
+    expected = {'remaining': seconds, 'resumed': START, 'error': 0.0}
+
+    def pause():
+        expected['remaining'] -= loop.now - expected['resumed']
+        timers.pause('Timer', loop.now)
+        ticker.schedule()
+        actual = recorder.countdown.remaining(loop.now)
+        expected['error'] = max(expected['error'], abs(actual - expected['remaining']))
+        recorder.deadline = None
+        recorder.shown = recorder.countdown.display_seconds(loop.now)
+
+    def resume():
+        expected['resumed'] = loop.now
+        start(loop, timers, ticker, recorder)
+
+    t = START
+    while True:
+        t += rng.uniform(600, 1200)
+        if t - START >= seconds * 0.9:
+            break
+        loop.call_at(t, pause)
+        t += rng.uniform(60, 300)
+        loop.call_at(t, resume)
+    loop.run_until(t + seconds)
+    result = summarize(ticker.wakeups, recorder)
+    result['pause_error_ms'] = expected['error'] * 1000
+    return result
+
+
+def run_reset_during_tick(latency_ms, seconds, seed=2):
+    """Reset and restart the countdown from inside some of its own ticks"""
+    loop = SimulatedLoop(latency_ms, seed)
+    rng = random.Random(seed)
+    timers, ticker, recorder = make_ticker(loop, seconds)
+    resets = sorted(rng.sample(range(10, max(11, seconds - 10)), min(3, max(1, seconds - 20))))
+    ticks = {'count': 0}
+    on_tick = ticker.on_tick
+
+    def tick_and_reset(expired):
+        on_tick(expired)
+        ticks['count'] += 1
+        if resets and ticks['count'] == resets[0]:
+            resets.pop(0)
+            timers.reset('Timer')
+            start(loop, timers, ticker, recorder)
+
+    ticker.on_tick = tick_and_reset
+    start(loop, timers, ticker, recorder)
+    loop.run_until(START + 4 * seconds)
+    result = summarize(ticker.wakeups, recorder)
+    # Any expiry before the last restart's deadline was spurious
+    result['early_expiries'] = sum(1 for at, deadline in recorder.expiries if at < deadline)
+    return result
+
+
+def run_many_timers(latency_ms, seconds, count=20, seed=3):
+    """Many timers with one Ticker, the first five on screen as in the list view"""
+    loop = SimulatedLoop(latency_ms, seed)
+    rng = random.Random(seed)
+    names = [f"Timer {i + 1}" for i in range(count)]
+    timers, ticker, recorder = make_ticker(loop, seconds, names, names[:5])
+    deadlines = {}
+    for name in names:
+        timers.add(name, rng.randint(seconds // 10, seconds))
+        timers.start(name, loop.now)
+        deadlines[name] = timers.get(name).deadline
+    recorder.deadline = deadlines[names[0]]
+    recorder.shown = recorder.countdown.display_seconds(loop.now)
+    ticker.schedule()
+
+    errors = []
+    on_tick = ticker.on_tick
+
+    def tick(expired):
+        on_tick(expired)
+        errors.extend(loop.now - deadlines[countdown.name] for countdown in expired)
+
+    ticker.on_tick = tick
+    loop.run_until(START + seconds + 5)
+    result = summarize(ticker.wakeups, recorder, max(errors, default=math.nan))
+    result['expiries'] = len(errors)
+    return result
+
+
+def run_naive(latency_ms, seconds):
+    """The old widget: a repeating one-second timeout decrementing a counter"""
+    loop = SimulatedLoop(latency_ms)
+    state = {'remaining': seconds, 'wakeups': 0, 'finished': None}
+
+    def update_timer():
+        state['wakeups'] += 1
+        state['remaining'] -= 1
+        if state['remaining'] <= 0:
+            state['finished'] = loop.now
+            return False
+        return True
+
+    loop.timeout_add(1000, update_timer)
+    loop.run_until(START + 2 * seconds + 60)
+    finished = state['finished'] if state['finished'] is not None else math.inf
+    return {
+        'wakeups': state['wakeups'],
+        'expiry_error_ms': (finished - (START + seconds)) * 1000,
+    }
+
+
+SCENARIOS = {
+    'countdown': lambda latency, seconds: run_countdown(latency, seconds),
+    'countdown_obscured': lambda latency, seconds: run_countdown(latency, seconds, obscured=True),
+    'pause_resume': run_pause_resume,
+    'reset_during_tick': lambda latency, seconds: run_reset_during_tick(latency, min(seconds, 600)),
+    'many_timers': run_many_timers,
+    'naive_baseline': run_naive,
+}
+
+
+def check(name, latency_ms, result):
+    """Get the problems of one result, an empty list if it behaved"""
+    # A wakeup may be late by the slack plus twice the mean latency, never more
+    bound_ms = TICK_SLACK_MS + 2 * latency_ms + 1
+    problems = []
+    if name == 'naive_baseline':
+        return problems
+    if name == 'countdown_obscured':
+        bound_ms += 1000  # Coalesced seconds timers may fire up to a second late
+    if not result['expiry_error_ms'] <= bound_ms:
+        problems.append(f"expiry off by {result['expiry_error_ms']:.1f} ms")
+    if name != 'countdown_obscured' and result['max_late_ms'] > bound_ms:
+        problems.append(f"a second shown {result['max_late_ms']:.1f} ms late")
+    if result.get('pause_error_ms', 0) > 1:
+        problems.append(f"pause lost {result['pause_error_ms']:.1f} ms")
+    if result.get('early_expiries'):
+        problems.append(f"{result['early_expiries']} early expiries")
+    if name != 'countdown_obscured' and result['skipped_seconds']:
+        problems.append(f"{result['skipped_seconds']} seconds never shown")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Countdown timer simulation")
+    parser.add_argument('--hours', type=float, default=3, help="length of the simulated countdowns")
+    parser.add_argument('--latency', type=float, nargs='+', default=LATENCIES_MS, metavar='MS',
+                        help="mean main-loop latencies to simulate")
+    parser.add_argument('-o', '--output', help="where to write the JSON results")
+    parser.add_argument('--check', action='store_true',
+                        help="exit with status 1 if any timing bound is broken")
+    args = parser.parse_args()
+
+    seconds = int(args.hours * 3600)
+    results = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'seconds': seconds,
+        'results': [],
+    }
+    failures = 0
+
+    for latency_ms in args.latency:
+        for name, scenario in SCENARIOS.items():
+            result = scenario(latency_ms, seconds)
+            results['results'].append(dict(scenario=name, latency_ms=latency_ms, **result))
+            late = (f"late mean {result['mean_late_ms']:7.2f} max {result['max_late_ms']:7.2f} ms"
+                    if 'max_late_ms' in result else ' ' * 33)
+            print(f"{name:<19} {latency_ms:>5g} ms  {result['wakeups']:>6} wakeups  {late}  "
+                  f"expiry error {result['expiry_error_ms']:10.2f} ms")
+            for problem in check(name, latency_ms, result):
+                print(f"    FAIL: {problem}")
+                failures += 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
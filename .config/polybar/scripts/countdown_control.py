@@ -0,0 +1,262 @@
+"""
+Countdown timer control socket
+A local unix socket on the running timer widget plus the client used by `timer.py set/start/pause/status`
+"""
+
+import fcntl
+import json
+import os
+import socket
+import sys
+import time
+
+from countdown import parse_duration
+
+RUNTIME_DIR = os.environ.get('XDG_RUNTIME_DIR') or f"/tmp/countdown-timer-{os.getuid()}"
+SOCKET_PATH = os.path.join(RUNTIME_DIR, 'countdown_timer.sock')
+LOCK_PATH = SOCKET_PATH + '.lock'  # Held by the process owning the socket
+CLIENT_TIMEOUT = 2  # Seconds to wait for the widget to answer
+CLAIM_ATTEMPTS = 20  # Times a starting widget asks the polybar module for the socket
+CLAIM_RETRY = 0.1  # Seconds between those attempts
+
+
+def format_time(seconds):
+    """Format seconds as MM:SS"""
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def timer_status(countdown, now):
+    return {
+        'name': countdown.name,
+        'total': countdown.total_seconds,
+        'remaining': round(countdown.remaining(now), 3),
+        'display': format_time(countdown.display_seconds(now)),
+        'running': countdown.running,
+    }
+
+
+def status_response(host, now):
+    return {
+        'ok': True,
+        'selected': host.selected,
+        'timers': [timer_status(countdown, now) for countdown in host.timers],
+    }
+
+
+def handle_request(host, request):
+    """Apply a request to host.timers, return (response, changed)
+
+    `host` has a TimerSet in `timers`, the default timer name in `selected`,
+    its monotonic `clock` and the `watchers` following it. Only the polybar
+    module has `release()`, handing the timers over to a starting widget.
+    """
+    command = request.get('command')
+    now = host.clock()
+    timers = host.timers
+
+    if command in ('status', 'watch'):
+        return status_response(host, now), False
+
+    if command == 'release':
+        if not hasattr(host, 'release'):
+            return {'ok': False, 'error': "The timers are owned by a widget"}, False
+        host.release()
+        return {'ok': True}, False
+
+    name = request.get('name') or host.selected
+    if timers.get(name) is None:
+        return {'ok': False, 'error': f"Unknown timer: {name}"}, False
+
+    if command == 'set':
+        try:
+            seconds = parse_duration(str(request.get('duration', '')))
+        except ValueError as e:
+            return {'ok': False, 'error': str(e)}, False
+        countdown = timers.add(name, seconds)
+        return {'ok': True, 'timer': timer_status(countdown, now)}, True
+
+    if command == 'remove':
+        # Hosts always show a selected timer
+        if len(timers) == 1:
+            return {'ok': False, 'error': f"Cannot remove the last timer: {name}"}, False
+        timers.remove(name)
+        if host.selected == name:
+            host.selected = next(iter(timers)).name
+        return status_response(host, now), True
+
+    if command in ('start', 'pause', 'reset', 'toggle'):
+        countdown = timers.get(name)
+        if command == 'toggle':
+            command = 'pause' if countdown.running else 'start'
+        if command == 'start':
+            timers.start(name, now)
+        elif command == 'pause':
+            timers.pause(name, now)
+        else:
+            timers.reset(name)
+        return {'ok': True, 'timer': timer_status(countdown, now)}, True
+
+    return {'ok': False, 'error': f"Unknown command: {command}"}, False
+
+
+class ServerSocket(socket.socket):
+    """The listening socket, holding the ownership lock until it is closed"""
+
+    lock = None
+
+    def close(self):
+        """Stop listening, removing the socket file before giving up the lock"""
+        super().close()
+        if self.lock is not None:
+            try:
+                os.unlink(SOCKET_PATH)
+            except OSError:
+                pass
+            self.lock.close()
+            self.lock = None
+
+
+def create_server_socket():
+    """Create the listening socket, or None if another widget or bar owns it
+
+    Ownership is an flock on LOCK_PATH, so two processes starting at once
+    never both bind, and a socket file left without a lock is stale.
+    """
+    os.makedirs(RUNTIME_DIR, mode=0o700, exist_ok=True)
+    lock = open(LOCK_PATH, 'a')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+
+    server = ServerSocket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.lock = lock
+    server.bind(SOCKET_PATH)
+    server.listen(4)
+    server.setblocking(False)
+    return server
+
+
+def claim_server_socket():
+    """Create the listening socket for a widget, or None if another widget owns it
+
+    The polybar module serves the timers while no widget runs. It saves
+    them and gives the socket up when asked, but it or another bar may
+    grab it again before we bind, so ask a few times.
+    """
+    for _ in range(CLAIM_ATTEMPTS):
+        response = send_request({'command': 'release'})
+        if response is not None and not response.get('ok'):
+            return None
+        server = create_server_socket()
+        if server is not None:
+            return server
+        time.sleep(CLAIM_RETRY)
+    return None
+
+
+def serve_request(server, host):
+    """Answer one pending client on the server socket, return True if a timer changed
+
+    A 'watch' client stays connected and is sent the status again by
+    notify_watchers() on every change.
+    """
+    try:
+        conn, _ = server.accept()
+    except BlockingIOError:
+        return False
+
+    changed = False
+    watch = False
+    conn.settimeout(CLIENT_TIMEOUT)
+    try:
+        request = json.loads(conn.makefile('rb').readline())
+        response, changed = handle_request(host, request)
+        watch = request.get('command') == 'watch'
+    except (OSError, ValueError) as e:
+        response = {'ok': False, 'error': str(e)}
+    try:
+        conn.sendall(json.dumps(response).encode() + b'\n')
+    except OSError:
+        watch = False
+    if watch:
+        host.watchers.append(conn)
+    else:
+        conn.close()
+    return changed
+
+
+def notify_watchers(host):
+    """Send the status to every client following the timers, dropping those that left"""
+    if not host.watchers:
+        return
+    line = json.dumps(status_response(host, host.clock())).encode() + b'\n'
+    for conn in list(host.watchers):
+        try:
+            conn.sendall(line)
+        except OSError:
+            host.watchers.remove(conn)
+            conn.close()
+
+
+def close_watchers(host):
+    for conn in host.watchers:
+        conn.close()
+    host.watchers.clear()
+
+
+def open_watch():
+    """Follow the timers, return a socket receiving a status line on every change, or None"""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(CLIENT_TIMEOUT)
+        client.connect(SOCKET_PATH)
+        client.sendall(json.dumps({'command': 'watch'}).encode() + b'\n')
+    except (FileNotFoundError, ConnectionError, BlockingIOError, socket.timeout):
+        client.close()
+        return None
+    client.settimeout(None)
+    return client
+
+
+def send_request(request):
+    """Send a request to the running widget, return its response or None if not running"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CLIENT_TIMEOUT)
+            client.connect(SOCKET_PATH)
+            client.sendall(json.dumps(request).encode() + b'\n')
+            line = client.makefile('rb').readline()
+    except (FileNotFoundError, ConnectionError, BlockingIOError, socket.timeout):
+        return None
+    return json.loads(line) if line else None
+
+
+def run_request(request):
+    """Send a request to the running widget"""
+    response = send_request(request)
+    if response is None:
+        return {'ok': False, 'error': "The countdown timer is not running"}
+    return response
+
+
+def print_response(response, as_json=False):
+    """Print a response for the command line, return the exit status"""
+    if as_json:
+        print(json.dumps(response))
+    elif not response.get('ok'):
+        print(response.get('error'), file=sys.stderr)
+    elif 'timers' in response:
+        for timer in response['timers']:
+            state = 'running' if timer['running'] else 'stopped'
+            mark = '*' if timer['name'] == response['selected'] else ' '
+            print(f"{mark} {timer['name']}: {timer['display']} ({state})")
+    else:
+        timer = response['timer']
+        print(f"{timer['name']}: {timer['display']} ({'running' if timer['running'] else 'stopped'})")
+    return 0 if response.get('ok') else 1
@@ -0,0 +1,178 @@
+"""
+Countdown timer polybar module
+Prints the selected timer as a polybar tail line with click actions, without GTK or cairo
+"""
+
+import json
+import math
+import os
+import select
+import shlex
+import sys
+import time
+
+from countdown import load_timers, restore_state, run_action, save_state
+from countdown_control import (close_watchers, create_server_socket, format_time,
+                               notify_watchers, open_watch, serve_request)
+
+RUNNING_COLOR = '#33cc33'
+STOPPED_COLOR = '#808080'
+TIMER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'timer.py')
+FOLLOW_RETRY = 0.1  # Seconds between attempts to follow a widget taking the socket over
+RELEASE_GRACE = 2  # Seconds a released module waits for the widget before serving again
+TICK_SLACK = 0.005  # Wake this long after a displayed second changes
+
+
+class TimerHost:
+    """The timers served on the control socket while no widget is running
+
+    A starting widget takes them over with a 'release' request.
+    """
+
+    def __init__(self, server, timers, selected=None):
+        self.server = server
+        self.timers = timers
+        self.selected = selected or next(iter(timers)).name
+        self.clock = time.monotonic
+        self.watchers = []  # Other bars following the timers
+        self.released = False
+
+    def release(self):
+        """Save the timers and give up the socket, before the widget is answered"""
+        save_state(self.timers, self.selected)
+        self.close()
+        self.released = True
+
+    def close(self):
+        if self.server is None:
+            return
+        close_watchers(self)
+        self.server.close()
+        self.server = None
+
+
+def click_action(button, command):
+    """Get the opening %{A} tag that runs `timer.py <command>` on a mouse button"""
+    action = f"{shlex.quote(TIMER_SCRIPT)} {command}".replace(':', '\\:')
+    return f"%{{A{button}:{action}:}}"
+
+
+def format_line(name, seconds, running, show_name):
+    """Format a timer for polybar: left click starts or pauses, right click resets"""
+    color = RUNNING_COLOR if running else STOPPED_COLOR
+    label = f"{name} {format_time(seconds)}" if show_name else format_time(seconds)
+    return (click_action(1, 'toggle') + click_action(3, 'reset')
+            + f"%{{F{color}}}⏱%{{F-}} {label}%{{A}}%{{A}}")
+
+
+def print_line(line, last_line):
+    if line != last_line:
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
+    return line
+
+
+def serve(server):
+    """Own the timers, printing on every displayed-second change and answering clicks
+
+    Returns True once the timers were handed over to a widget.
+    """
+    timers = load_timers()
+    selected, expired = restore_state(timers)
+    host = TimerHost(server, timers, selected)
+    last_line = None
+
+    try:
+        while True:
+            now = host.clock()
+            expired += host.timers.expire_due(now)
+            for countdown in expired:
+                run_action(countdown)
+            if expired:
+                save_state(host.timers, host.selected)
+                notify_watchers(host)
+                expired = []
+
+            countdown = host.timers.get(host.selected)
+            last_line = print_line(format_line(countdown.name, countdown.display_seconds(now),
+                                               countdown.running, len(host.timers) > 1), last_line)
+
+            # Sleep until the shown second changes or any timer expires, both fixed deadlines
+            timeout = None
+            deadline = host.timers.next_deadline()
+            if deadline is not None:
+                change = host.timers.next_change_in(now, [host.selected])
+                timeout = max(0, min(deadline - now, change if change is not None else math.inf))
+                timeout += TICK_SLACK
+            readable, _, _ = select.select([server], [], [], timeout)
+            if readable and serve_request(server, host):
+                save_state(host.timers, host.selected)
+                notify_watchers(host)
+            if host.released:
+                return True
+    finally:
+        host.close()
+
+
+def follow(wait=0):
+    """Mirror the selected timer of the owner of the control socket until it quits
+
+    The owner sends its status on every change, so this only wakes when the
+    shown second changes, and not at all while the timer is stopped. With
+    `wait`, keep trying that many seconds for an owner that is starting up.
+    """
+    give_up = time.monotonic() + wait
+    client = open_watch()
+    while client is None and time.monotonic() < give_up:
+        time.sleep(FOLLOW_RETRY)
+        client = open_watch()
+    if client is None:
+        return
+
+    last_line = None
+    timer = None
+    timer_count = 0
+    received = 0
+    pending = b''
+    with client:
+        while True:
+            timeout = None
+            if timer is not None:
+                # Derive the shown second from the remaining time, as the owner does
+                remaining = timer['remaining']
+                if timer['running']:
+                    remaining = max(0.0, remaining - (time.monotonic() - received))
+                last_line = print_line(format_line(timer['name'], math.ceil(remaining),
+                                                   timer['running'], timer_count > 1), last_line)
+                if timer['running'] and remaining > 0:
+                    timeout = remaining - (math.ceil(remaining) - 1) + TICK_SLACK
+
+            readable, _, _ = select.select([client], [], [], timeout)
+            if not readable:
+                continue
+            try:
+                data = client.recv(4096)
+            except ConnectionError:
+                data = b''
+            if not data:
+                # The owner quit or handed the timers over
+                return
+            *lines, pending = (pending + data).split(b'\n')
+            if lines:
+                response = json.loads(lines[-1])
+                received = time.monotonic()
+                timers = response['timers']
+                timer_count = len(timers)
+                timer = next((t for t in timers if t['name'] == response['selected']), timers[0])
+
+
+def run():
+    """Serve the timers, or follow the desktop widget while it owns the control socket"""
+    while True:
+        server = create_server_socket()
+        if server is None:
+            follow()
+            continue
+        if serve(server):
+            # Leave the widget time to bind before trying to serve again
+            follow(RELEASE_GRACE)
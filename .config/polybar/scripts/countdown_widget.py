@@ -0,0 +1,991 @@
+"""
+Countdown Timer Widget for i3wm
+A transparent desktop widget for countdown timers
+"""
+
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GLib, Gio
+import cairo
+import math
+import sys
+import time
+
+from countdown import Ticker, load_timers, restore_state, run_action, save_state
+from countdown_control import (claim_server_socket, close_watchers, notify_watchers,
+                               serve_request)
+from scene_graph import Node, Scene, rounded_rectangle
+from stopwatch import Stopwatch, format_tenths
+from text_cache import TextCache
+
+WIDTH = 280
+HEIGHT = 280
+
+PANEL_COLOR = (0.1, 0.1, 0.1, 0.7)
+PANEL_RECT = (10, 10, 260, 260)
+NAME_RECT = (20, 16, 150, 22)  # Timer name or view title above the ring
+
+# The time display, the only part redrawn on a tick
+FONT_TIME = ("Fira Code", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 64)
+TIME_RECT = (20, 100, 240, 76)
+TIME_BASELINE = 160
+
+# Progress ring below the name row, eased on the frame clock after start, pause
+# and reset, otherwise stepped by a timeout. The icon buttons sit in the panel
+# corners outside it, the start and reset buttons inside
+RING_CENTER = (140, 154)
+RING_RADIUS = 110
+RING_WIDTH = 6
+RING_MIN_STEP = 1.0  # Device pixels the arc end must move before it is redrawn
+RING_EASE_MS = 250
+RING_PAD = RING_RADIUS + RING_WIDTH / 2 + 1
+RING_RECT = (RING_CENTER[0] - RING_PAD, RING_CENTER[1] - RING_PAD, 2 * RING_PAD, 2 * RING_PAD)
+
+# List view rows
+FONT_TITLE = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 18)
+FONT_BUTTON = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 12)
+FONT_ICON = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 16)
+FONT_ROW = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL, 13)
+FONT_ROW_TIME = ("Fira Code", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 13)
+LIST_X = 20
+LIST_Y = 55
+LIST_ROW_HEIGHT = 26
+LIST_ROWS = 5
+LIST_RECT = (LIST_X, LIST_Y, 240, LIST_ROWS * LIST_ROW_HEIGHT)
+
+# Stopwatch view, only the changed digits are redrawn on a tick
+FONT_STOPWATCH = ("Fira Code", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 44)
+STOPWATCH_RECT = (20, 88, 240, 52)
+STOPWATCH_BASELINE = 130
+LAP_Y = 160
+LAP_ROW_HEIGHT = 14
+LAP_ROWS = 3
+LAP_RECT = (20, LAP_Y - 12, 240, LAP_ROWS * LAP_ROW_HEIGHT + 2)
+
+# Set time view input box
+FONT_MODE = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 14)
+FONT_INPUT = ("Fira Code", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 36)
+INPUT_RECT = (40, 110, 200, 60)
+
+
+class CountdownTimer(Gtk.Window):
+    def __init__(self, clock=time.monotonic, scheduler=GLib, clock_ns=time.monotonic_ns):
+        super().__init__()
+        
+        # Take the control socket before restoring the timers, so a polybar
+        # module that served them meanwhile has saved them and now follows us
+        self.control_socket = claim_server_socket()
+        if self.control_socket is None:
+            raise RuntimeError("Another countdown widget owns the timers")
+        self.watchers = []  # Polybar modules following the timers
+        
+        # Timer state, one wakeup serves every timer. Time is only read from
+        # `clock` and timeouts only armed through `scheduler`, see Ticker
+        self.clock = clock
+        self.timers = load_timers()
+        selected, expired = restore_state(self.timers)
+        self.selected = selected or next(iter(self.timers)).name
+        self.ticker = Ticker(self.timers, scheduler, clock, self.get_shown_timers, self.on_tick)
+        self.ring_tick_id = None  # Frame clock callback while the ring eases
+        self.ring_ease = None  # (progress, frame time) the ease started from
+        self.ring_step_id = None  # Timeout moving the running ring by a pixel
+        self.ring_progress = 0.0  # Share of the time left, as last drawn
+        
+        # Stopwatch state, ticking every tenth only while its digits can be seen
+        self.clock_ns = clock_ns
+        self.stopwatch = Stopwatch()
+        self.stopwatch_id = None
+        self.stopwatch_text = None  # As last damaged while ticking
+        self.stopwatch_xs = []  # Left edge of every character of the drawn text
+        self.screen_blanked = False
+        
+        # View state
+        self.view_mode = 'main'  # 'main', 'set_time', 'list' or 'stopwatch'
+        self.input_text = ""
+        self.input_mode = 'minutes'  # 'minutes' or 'seconds'
+        self.editing = None  # Name of the timer being set
+        self.adding = False  # Whether `editing` is a new timer, only created on Done
+        
+        # Node tree of each view; buttons and labels keep cached surfaces,
+        # hover changes damage only the nodes involved. Digits are pre-shaped
+        self.scene = Scene(lambda cause, rect: self.queue_draw_area(*rect))
+        self.views = self.build_views()
+        self.text = TextCache()
+        
+        # What a click on each node does, given the node's hit detail
+        self.click_actions = {
+            'start': lambda detail: self.toggle_running(),
+            'reset': lambda detail: self.reset_or_lap(),
+            'set': lambda detail: self.open_set_time(),
+            'list': lambda detail: self.set_view('list'),
+            'stopwatch': lambda detail: self.set_view('main' if self.view_mode == 'stopwatch'
+                                                      else 'stopwatch'),
+            'rows': self.on_row_clicked,
+            'add': lambda detail: self.add_timer(),
+            'back': lambda detail: self.set_view('main'),
+            'done': lambda detail: self.apply_time(),
+            'cancel': lambda detail: self.cancel_set_time(),
+        }
+        
+        # Window setup
+        self.set_title("Countdown Timer")
+        self.set_default_size(WIDTH, HEIGHT)
+        self.set_decorated(False)
+        self.set_resizable(False)
+        
+        # Set proper window role
+        self.set_role("countdown_timer")
+        
+        # Make window transparent
+        screen = self.get_screen()
+        visual = screen.get_rgba_visual()
+        if visual and screen.is_composited():
+            self.set_visual(visual)
+        
+        # Set window properties
+        self.set_type_hint(Gdk.WindowTypeHint.DESKTOP)
+        self.set_keep_below(True)
+        self.stick()
+        
+        # Prevent i3 tiling
+        self.set_accept_focus(False)
+        self.set_can_focus(False)
+        self.set_skip_taskbar_hint(True)
+        self.set_skip_pager_hint(True)
+        
+        # Position window
+        display = Gdk.Display.get_default()
+        monitor = display.get_primary_monitor()
+        geometry = monitor.get_geometry()
+        screen_width = geometry.width
+        screen_height = geometry.height
+        
+        x = (screen_width - WIDTH) // 2
+        y = (screen_height - HEIGHT) // 2 + 150
+        self.move(x, y)
+        
+        # Set up for transparency and drawing
+        self.set_app_paintable(True)
+        self.connect('screen-changed', self.on_screen_changed)
+        self.text.set_font_options(screen.get_font_options())
+        self.add_events(Gdk.EventMask.VISIBILITY_NOTIFY_MASK)
+        self.connect('visibility-notify-event', self.on_visibility_changed)
+        
+        # Create drawing area
+        self.drawing_area = Gtk.DrawingArea()
+        # The only draw handler, so each expose is painted once
+        self.drawing_area.connect('draw', self.on_draw)
+        self.drawing_area.add_events(Gdk.EventMask.POINTER_MOTION_MASK | 
+                                     Gdk.EventMask.BUTTON_PRESS_MASK |
+                                     Gdk.EventMask.LEAVE_NOTIFY_MASK |
+                                     Gdk.EventMask.KEY_PRESS_MASK)
+        self.drawing_area.connect('motion-notify-event', self.on_mouse_move)
+        self.drawing_area.connect('button-press-event', self.on_click)
+        self.drawing_area.connect('leave-notify-event', self.on_mouse_leave)
+        self.drawing_area.connect('key-press-event', self.on_key_press)
+        self.drawing_area.set_can_focus(True)
+        self.add(self.drawing_area)
+        
+        # Listen for set/start/pause requests from keybindings, no focus needed
+        GLib.io_add_watch(self.control_socket.fileno(), GLib.PRIORITY_DEFAULT,
+                          GLib.IO_IN, self.on_control_request)
+        self.connect('destroy', self.on_destroy)
+        
+        # Stop the stopwatch digits while a screen saver blanks the screen
+        try:
+            self.session_bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+            self.session_bus.signal_subscribe(None, 'org.freedesktop.ScreenSaver',
+                                              'ActiveChanged', None, None,
+                                              Gio.DBusSignalFlags.NONE,
+                                              self.on_screensaver_changed)
+        except GLib.Error:
+            self.session_bus = None
+        
+        # Continue the timers restored from the last run, and report those that ran out meanwhile
+        for countdown in expired:
+            run_action(countdown)
+        if expired:
+            self.save_state()
+        self.schedule_tick()
+    
+    def build_views(self):
+        """Build the node tree of every view, later nodes are drawn and hit on top"""
+        def button(name, rect, draw):
+            # Cached over the panel, repainted when hovered or relabelled
+            return Node(name, rect, draw, cache=True, background=PANEL_COLOR, hit=True,
+                        key=lambda: (self.scene.hovered(name), self.view_mode,
+                                     self.is_running, self.stopwatch.running))
+        
+        def label(text):
+            return Node('title', NAME_RECT, lambda cr: self.draw_title(cr, text()), cache=True,
+                        background=PANEL_COLOR, key=text)
+        
+        return {
+            'main': Node('panel', PANEL_RECT, self.draw_panel, [
+                label(lambda: self.selected),
+                button('set', self.get_set_button_rect(), self.draw_set_button),
+                button('list', self.get_list_button_rect(), self.draw_list_button),
+                button('stopwatch', self.get_stopwatch_button_rect(), self.draw_stopwatch_button),
+                button('start', self.get_start_button_rect(), self.draw_start_button),
+                button('reset', self.get_reset_button_rect(), self.draw_reset_button),
+                Node('ring', RING_RECT, self.draw_ring),
+                Node('time', TIME_RECT, self.draw_time),
+            ]),
+            'stopwatch': Node('panel', PANEL_RECT, self.draw_panel, [
+                label(lambda: "Stopwatch"),
+                button('stopwatch', self.get_stopwatch_button_rect(), self.draw_stopwatch_button),
+                button('start', self.get_start_button_rect(), self.draw_start_button),
+                button('reset', self.get_reset_button_rect(), self.draw_reset_button),
+                Node('digits', STOPWATCH_RECT, self.draw_stopwatch_digits),
+                Node('laps', LAP_RECT, self.draw_laps),
+            ]),
+            'list': Node('panel', PANEL_RECT, self.draw_list_panel, [
+                Node('rows', LIST_RECT, self.draw_list_rows, hit=self.list_hit,
+                     hover_rect=lambda detail: self.get_list_row_rect(detail[0])),
+                button('add', self.get_done_button_rect(), self.draw_add_button),
+                button('back', self.get_cancel_button_rect(), self.draw_back_button),
+            ]),
+            'set_time': Node('panel', PANEL_RECT, self.draw_set_time_panel, [
+                button('done', self.get_done_button_rect(), self.draw_done_button),
+                button('cancel', self.get_cancel_button_rect(), self.draw_cancel_button),
+            ]),
+        }
+    
+    def update_scene(self):
+        """Point the scene at the nodes of the current view"""
+        self.scene.set_root(self.views[self.view_mode])
+    
+    def on_screen_changed(self, widget, old_screen):
+        screen = self.get_screen()
+        visual = screen.get_rgba_visual()
+        if visual and screen.is_composited():
+            self.set_visual(visual)
+        self.text.set_font_options(screen.get_font_options())
+        self.scene.dirty()
+    
+    def on_screensaver_changed(self, connection, sender, path, interface, signal, parameters):
+        """Pause or resume the ring and stopwatch redraws with the screen saver"""
+        self.screen_blanked = bool(parameters[0])
+        self.schedule_tick()
+        if not self.screen_blanked:
+            self.queue_draw()
+    
+    def on_control_request(self, fd, condition):
+        """Answer a client on the control socket"""
+        if serve_request(self.control_socket, self):
+            self.save_state()
+            self.schedule_tick()
+            self.queue_draw()
+        return True
+    
+    def on_destroy(self, widget):
+        """Remove the control socket"""
+        close_watchers(self)
+        self.control_socket.close()
+    
+    def format_time(self, seconds):
+        """Format seconds as MM:SS"""
+        mins = seconds // 60
+        secs = seconds % 60
+        return f"{mins:02d}:{secs:02d}"
+    
+    @property
+    def countdown(self):
+        """The selected timer, shown in the main view"""
+        return self.timers.get(self.selected)
+    
+    @property
+    def is_running(self):
+        return self.countdown.running
+    
+    def save_state(self):
+        """Persist the timers and tell the following modules, on transitions only"""
+        save_state(self.timers, self.selected)
+        notify_watchers(self)
+    
+    def start_timer(self, name=None):
+        """Start a countdown, the selected one by default"""
+        self.timers.start(name or self.selected, self.clock())
+        self.save_state()
+        self.schedule_tick(ease=True)
+    
+    def pause_timer(self, name=None):
+        """Pause a countdown"""
+        self.timers.pause(name or self.selected, self.clock())
+        self.save_state()
+        self.schedule_tick(ease=True)
+    
+    def reset_timer(self):
+        """Reset timer to initial value"""
+        # Resetting also stops it, so one save covers both
+        self.timers.reset(self.selected)
+        self.save_state()
+        self.schedule_tick(ease=True)
+        self.queue_draw()
+    
+    def toggle_running(self):
+        """Start or pause the selected timer, or the stopwatch in its view"""
+        if self.view_mode == 'stopwatch':
+            self.toggle_stopwatch()
+        elif self.is_running:
+            self.pause_timer()
+        else:
+            self.start_timer()
+        self.scene.damage('start', 'ring', 'time')
+    
+    def reset_or_lap(self):
+        """Reset the selected timer, or lap or reset the stopwatch in its view"""
+        if self.view_mode == 'stopwatch':
+            self.lap_or_reset_stopwatch()
+        else:
+            self.reset_timer()
+    
+    def get_shown_timers(self):
+        """Get the names of the timers whose time is on screen"""
+        if self.view_mode == 'list':
+            return [countdown.name for countdown in list(self.timers)[:LIST_ROWS]]
+        if self.view_mode == 'main':
+            return [self.selected]
+        return []
+    
+    def schedule_tick(self, ease=False):
+        """Re-arm the wakeups and the ring animation after a change"""
+        self.ticker.schedule()
+        self.update_ring_animation(ease)
+        self.schedule_stopwatch()
+    
+    def schedule_stopwatch(self):
+        """Wake for the next tenth while the running stopwatch is on screen"""
+        if self.stopwatch_id:
+            self.ticker.scheduler.source_remove(self.stopwatch_id)
+            self.stopwatch_id = None
+        if (self.view_mode != 'stopwatch' or not self.stopwatch.running
+                or self.ticker.obscured or self.screen_blanked):
+            return
+        delay_ns = self.stopwatch.next_change_in_ns(self.clock_ns())
+        self.stopwatch_id = self.ticker.scheduler.timeout_add(
+            -(-delay_ns // 1_000_000) + 1, self.stopwatch_tick)
+    
+    def stopwatch_tick(self):
+        """Damage only the digits that changed since the last tenth"""
+        self.stopwatch_id = None
+        old = self.stopwatch_text
+        new = format_tenths(self.stopwatch.elapsed_ns(self.clock_ns()))
+        self.stopwatch_text = new
+        
+        x, y, width, height = STOPWATCH_RECT
+        if old is not None and len(old) == len(new) and len(self.stopwatch_xs) == len(new) + 1:
+            first = next((i for i, (a, b) in enumerate(zip(old, new)) if a != b), len(new))
+            if first < len(new):
+                left = math.floor(self.stopwatch_xs[first]) - 1
+                right = math.ceil(self.stopwatch_xs[-1]) + 1
+                self.queue_draw_area(left, y, right - left, height)
+        else:
+            self.queue_draw_area(x, y, width, height)
+        self.schedule_stopwatch()
+        return False
+    
+    def toggle_stopwatch(self):
+        """Start or pause the stopwatch"""
+        if self.stopwatch.running:
+            self.stopwatch.pause(self.clock_ns())
+        else:
+            self.stopwatch.start(self.clock_ns())
+        self.schedule_tick()
+        self.queue_draw()
+    
+    def lap_or_reset_stopwatch(self):
+        """Record a lap while running, reset while paused"""
+        if self.stopwatch.running:
+            self.stopwatch.lap(self.clock_ns())
+            self.queue_draw_area(*LAP_RECT)
+        else:
+            self.stopwatch.reset()
+            self.queue_draw()
+    
+    def get_progress(self, now):
+        """Get the share of the selected timer's time that is left"""
+        total = self.countdown.total_seconds
+        if total <= 0:
+            return 0.0
+        return min(1.0, self.countdown.remaining(now) / total)
+    
+    def ring_visible(self):
+        return self.view_mode == 'main' and not self.ticker.obscured and not self.screen_blanked
+    
+    def update_ring_animation(self, ease=False):
+        """Ease the ring on the frame clock after a jump, then step it while running"""
+        if not self.ring_visible():
+            if self.ring_tick_id is not None:
+                self.remove_tick_callback(self.ring_tick_id)
+                self.ring_tick_id = None
+        elif ease and self.ring_tick_id is None:
+            moved = abs(self.get_progress(self.clock()) - self.ring_progress) * 2 * math.pi * RING_RADIUS
+            if moved * self.get_scale_factor() >= RING_MIN_STEP:
+                self.ring_ease = (self.ring_progress, None)
+                self.ring_tick_id = self.add_tick_callback(self.on_ease_frame)
+        self.schedule_ring_step()
+    
+    def on_ease_frame(self, widget, frame_clock):
+        """Move the ring towards the timer's progress, ending after RING_EASE_MS"""
+        start, started = self.ring_ease
+        now = frame_clock.get_frame_time()  # Microseconds
+        if started is None:
+            self.ring_ease = start, now
+            started = now
+        t = min(1.0, (now - started) / (RING_EASE_MS * 1000))
+        target = self.get_progress(self.clock())
+        progress = start + (target - start) * (1 - (1 - t) ** 3)
+        if progress != self.ring_progress:
+            self.queue_draw_area(*self.get_ring_rect(progress, self.ring_progress))
+            self.ring_progress = progress
+        if t < 1.0:
+            return GLib.SOURCE_CONTINUE
+        self.ring_tick_id = None
+        self.schedule_ring_step()
+        return GLib.SOURCE_REMOVE
+    
+    def schedule_ring_step(self):
+        """Wake when the running ring's arc end has moved RING_MIN_STEP device pixels"""
+        if self.ring_step_id is not None:
+            self.ticker.scheduler.source_remove(self.ring_step_id)
+            self.ring_step_id = None
+        total = self.countdown.total_seconds
+        if (self.ring_tick_id is not None or not self.ring_visible()
+                or not self.is_running or total <= 0):
+            return
+        pixels_per_second = 2 * math.pi * RING_RADIUS * self.get_scale_factor() / total
+        self.ring_step_id = self.ticker.scheduler.timeout_add(
+            math.ceil(RING_MIN_STEP / pixels_per_second * 1000), self.ring_step)
+    
+    def ring_step(self):
+        """Damage only the part of the ring that moved since it was last drawn"""
+        self.ring_step_id = None
+        progress = self.get_progress(self.clock())
+        self.queue_draw_area(*self.get_ring_rect(progress, self.ring_progress))
+        self.ring_progress = progress
+        self.schedule_ring_step()
+        return False
+    
+    def get_ring_rect(self, start, end):
+        """Get the whole-pixel rectangle covering the ring between two progress values"""
+        cx, cy = RING_CENTER
+        start_angle = -math.pi / 2 + 2 * math.pi * min(start, end)
+        end_angle = -math.pi / 2 + 2 * math.pi * max(start, end)
+        
+        # The arc's extent is set by its ends and any axis it crosses
+        angles = [start_angle, end_angle]
+        quarter = math.ceil(start_angle / (math.pi / 2))
+        while quarter * math.pi / 2 < end_angle:
+            angles.append(quarter * math.pi / 2)
+            quarter += 1
+        xs = [cx + RING_RADIUS * math.cos(angle) for angle in angles]
+        ys = [cy + RING_RADIUS * math.sin(angle) for angle in angles]
+        
+        pad = RING_WIDTH / 2 + 1
+        x = math.floor(min(xs) - pad)
+        y = math.floor(min(ys) - pad)
+        return (x, y, math.ceil(max(xs) + pad) - x, math.ceil(max(ys) + pad) - y)
+    
+    def on_tick(self, expired):
+        """Report expired timers and update the display from the deadlines"""
+        for countdown in expired:
+            run_action(countdown)
+        
+        if expired:
+            self.save_state()
+            self.update_ring_animation()
+            self.queue_draw()
+        elif self.view_mode == 'list':
+            self.queue_draw_area(*LIST_RECT)
+        else:
+            self.queue_draw_area(*TIME_RECT)
+    
+    def on_visibility_changed(self, widget, event):
+        """Switch between per-second and coalesced wakeups"""
+        obscured = event.state == Gdk.VisibilityState.FULLY_OBSCURED
+        if obscured != self.ticker.obscured:
+            self.ticker.obscured = obscured
+            self.schedule_tick()
+            self.queue_draw()
+        return False
+    
+    def on_mouse_move(self, widget, event):
+        """Handle mouse movement, redrawing only the nodes whose hover changed"""
+        self.update_scene()
+        self.scene.update_hover(event.x, event.y)
+    
+    def on_mouse_leave(self, widget, event):
+        """Handle mouse leaving widget"""
+        self.scene.set_hover(None)
+
+    def get_start_button_rect(self):
+        """Get rectangle for start/pause button"""
+        return (65, 192, 60, 30)
+    
+    def get_reset_button_rect(self):
+        """Get rectangle for reset button"""
+        return (155, 192, 60, 30)
+    
+    def get_set_button_rect(self):
+        """Get rectangle for set time button"""
+        return (240, 15, 25, 25)
+    
+    def get_list_button_rect(self):
+        """Get rectangle for the timer list button"""
+        return (240, 240, 25, 25)
+    
+    def get_stopwatch_button_rect(self):
+        """Get rectangle for the stopwatch button"""
+        return (15, 240, 25, 25)
+    
+    def get_list_row_rect(self, row):
+        """Get rectangle for a row of the timer list"""
+        return (LIST_X, LIST_Y + row * LIST_ROW_HEIGHT, 240, LIST_ROW_HEIGHT - 2)
+    
+    def list_row_at(self, x, y):
+        """Get the index of the list row under a point"""
+        row = int((y - LIST_Y) // LIST_ROW_HEIGHT)
+        if not LIST_X <= x <= LIST_X + 240 or not 0 <= row < min(LIST_ROWS, len(self.timers)):
+            return None
+        return row
+    
+    def list_hit(self, x, y):
+        """Get (row, part) of the list row under a point, part is 'toggle', 'remove' or 'select'"""
+        row = self.list_row_at(x, y)
+        if row is None:
+            return None
+        if x >= LIST_X + 210:
+            return row, 'toggle'
+        # The last timer cannot be removed, hosts always show one
+        if x >= LIST_X + 186 and len(self.timers) > 1:
+            return row, 'remove'
+        return row, 'select'
+    
+    def get_done_button_rect(self):
+        """Get rectangle for done button"""
+        return (50, 210, 80, 30)
+    
+    def get_cancel_button_rect(self):
+        """Get rectangle for cancel button"""
+        return (150, 210, 80, 30)
+    
+    def on_click(self, widget, event):
+        """Run the click action of the node under the pointer"""
+        self.update_scene()
+        node, detail = self.scene.hit(event.x, event.y)
+        action = self.click_actions.get(node.name) if node else None
+        if action is None:
+            return False
+        action(detail)
+        return True
+    
+    def on_row_clicked(self, detail):
+        """Toggle or remove a listed timer from the end of its row, or select it"""
+        row, part = detail
+        countdown = list(self.timers)[row]
+        if part == 'toggle':
+            if countdown.running:
+                self.pause_timer(countdown.name)
+            else:
+                self.start_timer(countdown.name)
+            self.queue_draw_area(*self.get_list_row_rect(row))
+        elif part == 'remove':
+            self.remove_timer(countdown.name)
+        else:
+            self.selected = countdown.name
+            self.save_state()
+            self.set_view('main')
+
+    def set_view(self, view_mode):
+        """Switch view, rescheduling for the timers it shows"""
+        self.view_mode = view_mode
+        self.schedule_tick()
+        self.queue_draw()
+    
+    def add_timer(self):
+        """Open the set time view for a new timer, created only when Done is pressed"""
+        number = len(self.timers) + 1
+        while self.timers.get(f"Timer {number}"):
+            number += 1
+        self.open_set_time(f"Timer {number}")
+    
+    def remove_timer(self, name):
+        """Remove a timer, selecting the first one left if it was selected"""
+        if len(self.timers) < 2:
+            return
+        self.timers.remove(name)
+        if self.selected == name:
+            self.selected = next(iter(self.timers)).name
+        self.save_state()
+        self.schedule_tick()
+        self.queue_draw()
+    
+    def open_set_time(self, new_name=None):
+        """Open set time view, for the selected timer or for a new one"""
+        self.adding = new_name is not None
+        if self.adding:
+            self.editing = new_name
+        else:
+            self.editing = self.selected
+            self.pause_timer()
+        self.view_mode = 'set_time'
+        self.input_text = ""
+        self.input_mode = 'minutes'
+        self.set_accept_focus(True)
+        self.set_can_focus(True)
+        self.drawing_area.grab_focus()
+        self.queue_draw()
+    
+    def cancel_set_time(self):
+        """Cancel setting time, going back to the list when adding a timer"""
+        self.view_mode = 'list' if self.adding else 'main'
+        self.editing = None
+        self.adding = False
+        self.set_accept_focus(False)
+        self.set_can_focus(False)
+        self.schedule_tick()
+        self.queue_draw()
+    
+    def apply_time(self):
+        """Apply the set time, creating the timer being added"""
+        seconds = None
+        try:
+            if self.input_text:
+                value = int(self.input_text)
+                seconds = value * 60 if self.input_mode == 'minutes' else value
+        except ValueError:
+            pass
+        if self.adding:
+            self.selected = self.timers.add(self.editing, seconds or 0).name
+        else:
+            # The timer may have been removed over the control socket meanwhile
+            countdown = self.timers.get(self.editing)
+            if countdown is not None and seconds is not None:
+                countdown.set_total(seconds)
+        self.editing = None
+        self.adding = False
+        self.save_state()
+        
+        self.view_mode = 'main'
+        self.set_accept_focus(False)
+        self.set_can_focus(False)
+        self.schedule_tick()
+        self.queue_draw()
+    
+    def on_key_press(self, widget, event):
+        """Handle keyboard input"""
+        if self.view_mode != 'set_time':
+            return False
+        
+        keyval = event.keyval
+        keyname = Gdk.keyval_name(keyval)
+        
+        if keyname in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
+            if len(self.input_text) < 4:
+                self.input_text += keyname
+                self.queue_draw()
+        elif keyname == 'BackSpace':
+            if len(self.input_text) > 0:
+                self.input_text = self.input_text[:-1]
+                self.queue_draw()
+        elif keyname == 'Return' or keyname == 'KP_Enter':
+            self.apply_time()
+        elif keyname == 'Escape':
+            self.cancel_set_time()
+        elif keyname == 'm' or keyname == 'M':
+            self.input_mode = 'minutes'
+            self.queue_draw()
+        elif keyname == 's' or keyname == 'S':
+            self.input_mode = 'seconds'
+            self.queue_draw()
+        
+        return True
+    
+    def on_draw(self, widget, cr):
+        """Draw the nodes of the current view that intersect the clip"""
+        # Make background transparent
+        cr.set_source_rgba(0, 0, 0, 0)
+        cr.set_operator(cairo.OPERATOR_SOURCE)
+        cr.paint()
+        
+        self.text.check_context(cr)
+        self.update_scene()
+        self.scene.draw(cr)
+        
+        return False
+    
+    def draw_panel(self, cr):
+        """Draw background panel"""
+        cr.set_source_rgba(*PANEL_COLOR)
+        cr.rectangle(*PANEL_RECT)
+        cr.fill()
+    
+    def draw_title(self, cr, text):
+        """Draw the timer name or view title"""
+        cr.set_source_rgba(1, 1, 1, 0.7)
+        self.text.show(cr, FONT_ROW, text, 20, 32)
+    
+    def draw_ring(self, cr):
+        """Draw the progress ring"""
+        # Draw the ring as last damaged while it moves, so every frame matches its damage
+        if self.ring_tick_id is None and self.ring_step_id is None:
+            self.ring_progress = self.get_progress(self.clock())
+        self.draw_progress_circle(cr, *RING_CENTER, RING_RADIUS, self.ring_progress)
+    
+    def draw_time(self, cr):
+        """Draw time display from pre-shaped digits"""
+        time_str = self.format_time(self.countdown.display_seconds(self.clock()))
+        cr.set_source_rgba(1, 1, 1, 1)
+        width = self.text.fixed_width(cr, FONT_TIME, time_str)
+        self.text.show_fixed(cr, FONT_TIME, time_str, 140 - width/2, TIME_BASELINE)
+    
+    def draw_stopwatch_digits(self, cr):
+        """Draw the stopwatch time"""
+        # Draw the digits as last damaged while ticking, so every redraw matches its damage
+        if self.stopwatch_id is None:
+            self.stopwatch_text = format_tenths(self.stopwatch.elapsed_ns(self.clock_ns()))
+        text = self.stopwatch_text
+        x = 140 - self.text.fixed_width(cr, FONT_STOPWATCH, text) / 2
+        xs = [x]
+        for char in text:
+            x += self.text.char_glyph(cr, FONT_STOPWATCH, char)[1]
+            xs.append(x)
+        self.stopwatch_xs = xs
+        cr.set_source_rgba(1, 1, 1, 1)
+        self.text.show_fixed(cr, FONT_STOPWATCH, text, xs[0], STOPWATCH_BASELINE)
+    
+    def draw_laps(self, cr):
+        """Draw the newest laps with their lap and split times"""
+        for row, (number, lap_ns, split_ns) in enumerate(self.stopwatch.recent_laps(LAP_ROWS)):
+            y = LAP_Y + row * LAP_ROW_HEIGHT
+            cr.set_source_rgba(1, 1, 1, 0.7)
+            self.text.show(cr, FONT_ROW, f"Lap {number}", 30, y)
+            for time_str, right in ((format_tenths(lap_ns), 185), (format_tenths(split_ns), 250)):
+                width = self.text.fixed_width(cr, FONT_ROW_TIME, time_str)
+                self.text.show_fixed(cr, FONT_ROW_TIME, time_str, right - width, y)
+    
+    def draw_set_time_panel(self, cr):
+        """Draw set time view"""
+        self.draw_panel(cr)
+        
+        # Draw title
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        self.text.show(cr, FONT_TITLE, "New Timer" if self.adding else "Set Timer", 20, 40)
+        
+        # Draw mode selector
+        cr.set_source_rgba(1, 1, 1, 0.7)
+        self.text.show(cr, FONT_BUTTON, "Press M for minutes, S for seconds", 20, 70)
+        
+        # Draw current mode
+        mode_text = "Minutes" if self.input_mode == 'minutes' else "Seconds"
+        cr.set_source_rgba(0.2, 0.8, 0.2, 1)
+        self.text.show(cr, FONT_MODE, f"Mode: {mode_text}", 20, 95)
+        
+        # Draw input box
+        cr.set_source_rgba(0.15, 0.15, 0.15, 0.8)
+        rounded_rectangle(cr, *INPUT_RECT, 5)
+        cr.fill()
+        
+        # Draw border
+        cr.set_source_rgba(0.2, 0.8, 0.2, 0.6)
+        cr.set_line_width(2)
+        rounded_rectangle(cr, *INPUT_RECT, 5)
+        cr.stroke()
+        
+        # Draw input text from pre-shaped digits
+        display_text = self.input_text if self.input_text else "0"
+        cr.set_source_rgba(1, 1, 1, 1)
+        width = self.text.fixed_width(cr, FONT_INPUT, display_text)
+        self.text.show_fixed(cr, FONT_INPUT, display_text, 140 - width/2, 155)
+    
+    def draw_list_panel(self, cr):
+        """Draw the panel and title of the timer list"""
+        self.draw_panel(cr)
+        
+        # Draw title
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        self.text.show(cr, FONT_TITLE, "Timers", 20, 40)
+        
+        if len(self.timers) > LIST_ROWS:
+            cr.set_source_rgba(1, 1, 1, 0.5)
+            self.text.show(cr, FONT_ROW, f"+{len(self.timers) - LIST_ROWS} more", 20, 200)
+    
+    def draw_list_rows(self, cr):
+        """Draw the compact list of timers"""
+        now = self.clock()
+        hover = self.scene.hover_detail('rows')
+        for row, countdown in enumerate(list(self.timers)[:LIST_ROWS]):
+            x, y, w, h = self.get_list_row_rect(row)
+            
+            # Row background, highlighted for the selected timer
+            if countdown.name == self.selected or (hover and hover[0] == row):
+                cr.set_source_rgba(0.3, 0.3, 0.3, 0.6)
+            else:
+                cr.set_source_rgba(0.15, 0.15, 0.15, 0.6)
+            rounded_rectangle(cr, x, y, w, h, 3)
+            cr.fill()
+            
+            # Name, time, remove button and play/pause toggle
+            cr.set_source_rgba(1, 1, 1, 0.9)
+            self.text.show(cr, FONT_ROW, countdown.name, x + 8, y + 17)
+            time_str = self.format_time(countdown.display_seconds(now))
+            width = self.text.fixed_width(cr, FONT_ROW_TIME, time_str)
+            self.text.show_fixed(cr, FONT_ROW_TIME, time_str, x + 180 - width, y + 17)
+            if len(self.timers) > 1:
+                if hover == (row, 'remove'):
+                    cr.set_source_rgba(0.9, 0.3, 0.2, 1)
+                else:
+                    cr.set_source_rgba(1, 1, 1, 0.4)
+                self.text.show(cr, FONT_ROW, "✕", x + 190, y + 17)
+                cr.set_source_rgba(1, 1, 1, 0.9)
+            if countdown.running:
+                cr.set_source_rgba(0.2, 0.8, 0.2, 1)
+            self.text.show(cr, FONT_ROW, "❚❚" if countdown.running else "▶", x + 214, y + 17)
+    
+    def draw_add_button(self, cr):
+        self.draw_dialog_button(cr, self.get_done_button_rect(), "Add", 'add',
+                                (0.2, 0.6, 0.2, 0.6), (0.2, 0.8, 0.2, 0.8))
+    
+    def draw_back_button(self, cr):
+        self.draw_dialog_button(cr, self.get_cancel_button_rect(), "Back", 'back',
+                                (0.6, 0.2, 0.2, 0.6), (0.8, 0.3, 0.2, 0.8))
+
+    def draw_dialog_button(self, cr, rect, text, name, color, hover_color):
+        """Draw a labelled button"""
+        btn_x, btn_y, btn_w, btn_h = rect
+        cr.set_source_rgba(*(hover_color if self.scene.hovered(name) else color))
+        rounded_rectangle(cr, btn_x, btn_y, btn_w, btn_h, 3)
+        cr.fill()
+        
+        cr.set_source_rgba(1, 1, 1, 1)
+        extents = self.text.extents(cr, FONT_BUTTON, text)
+        self.text.show(cr, FONT_BUTTON, text,
+                       btn_x + (btn_w - extents.width) / 2, btn_y + (btn_h + extents.height) / 2 - 1)
+    
+    def draw_list_button(self, cr):
+        """Draw timer list button"""
+        btn_x, btn_y, btn_w, btn_h = self.get_list_button_rect()
+        
+        # Button background
+        if self.scene.hovered('list'):
+            cr.set_source_rgba(0.3, 0.3, 0.3, 0.8)
+        else:
+            cr.set_source_rgba(0.2, 0.2, 0.2, 0.6)
+        
+        cr.arc(btn_x + btn_w/2, btn_y + btn_h/2, btn_w/2, 0, 2 * math.pi)
+        cr.fill()
+        
+        # Three lines icon
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        cr.set_line_width(1.5)
+        for dy in (-4, 0, 4):
+            cr.move_to(btn_x + 7, btn_y + btn_h/2 + dy)
+            cr.line_to(btn_x + btn_w - 7, btn_y + btn_h/2 + dy)
+        cr.stroke()
+    
+    def draw_stopwatch_button(self, cr):
+        """Draw stopwatch button"""
+        btn_x, btn_y, btn_w, btn_h = self.get_stopwatch_button_rect()
+        
+        # Button background, lit while the stopwatch view is open
+        if self.scene.hovered('stopwatch'):
+            cr.set_source_rgba(0.3, 0.3, 0.3, 0.8)
+        elif self.view_mode == 'stopwatch':
+            cr.set_source_rgba(0.2, 0.6, 0.2, 0.6)
+        else:
+            cr.set_source_rgba(0.2, 0.2, 0.2, 0.6)
+        
+        cr.arc(btn_x + btn_w/2, btn_y + btn_h/2, btn_w/2, 0, 2 * math.pi)
+        cr.fill()
+        
+        # Stopwatch icon
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        cr.set_line_width(1.5)
+        cx = btn_x + btn_w/2
+        cy = btn_y + btn_h/2 + 1
+        cr.arc(cx, cy, 6, 0, 2 * math.pi)
+        cr.move_to(cx, cy)
+        cr.line_to(cx, cy - 4)
+        cr.move_to(cx - 2, cy - 9)
+        cr.line_to(cx + 2, cy - 9)
+        cr.stroke()
+    
+    def draw_progress_circle(self, cr, cx, cy, radius, progress):
+        """Draw circular progress indicator"""
+        # Background circle
+        cr.set_source_rgba(0.2, 0.2, 0.2, 0.3)
+        cr.set_line_width(RING_WIDTH)
+        cr.new_path()
+        cr.arc(cx, cy, radius, 0, 2 * math.pi)
+        cr.stroke()
+        
+        # Progress arc
+        if progress > 0:
+            cr.set_source_rgba(0.2, 0.8, 0.2, 0.8)
+            cr.set_line_width(RING_WIDTH)
+            start_angle = -math.pi / 2
+            end_angle = start_angle + (2 * math.pi * progress)
+            cr.arc(cx, cy, radius, start_angle, end_angle)
+            cr.stroke()
+    
+    def draw_set_button(self, cr):
+        """Draw set time button (gear icon)"""
+        btn_x, btn_y, btn_w, btn_h = self.get_set_button_rect()
+        
+        # Button background
+        if self.scene.hovered('set'):
+            cr.set_source_rgba(0.3, 0.3, 0.3, 0.8)
+        else:
+            cr.set_source_rgba(0.2, 0.2, 0.2, 0.6)
+        
+        cr.arc(btn_x + btn_w/2, btn_y + btn_h/2, btn_w/2, 0, 2 * math.pi)
+        cr.fill()
+        
+        # Gear icon (simplified)
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        self.text.show(cr, FONT_ICON, "⚙", btn_x + 6, btn_y + 18)
+    
+    def draw_start_button(self, cr):
+        """Draw start/pause button"""
+        running = self.stopwatch.running if self.view_mode == 'stopwatch' else self.is_running
+        self.draw_dialog_button(cr, self.get_start_button_rect(), "Pause" if running else "Start",
+                                'start', (0.2, 0.6, 0.2, 0.6), (0.2, 0.8, 0.2, 0.8))
+    
+    def draw_reset_button(self, cr):
+        """Draw reset button"""
+        text = "Lap" if self.view_mode == 'stopwatch' and self.stopwatch.running else "Reset"
+        self.draw_dialog_button(cr, self.get_reset_button_rect(), text, 'reset',
+                                (0.6, 0.2, 0.2, 0.6), (0.8, 0.3, 0.2, 0.8))
+    
+    def draw_done_button(self, cr):
+        """Draw done button"""
+        self.draw_dialog_button(cr, self.get_done_button_rect(), "Done", 'done',
+                                (0.2, 0.6, 0.2, 0.6), (0.2, 0.8, 0.2, 0.8))
+    
+    def draw_cancel_button(self, cr):
+        """Draw cancel button"""
+        self.draw_dialog_button(cr, self.get_cancel_button_rect(), "Cancel", 'cancel',
+                                (0.6, 0.2, 0.2, 0.6), (0.8, 0.3, 0.2, 0.8))
+
+
+def create_window():
+    """Create and show the widget window, for main() or the widget host"""
+    win = CountdownTimer()
+    win.show_all()
+    
+    window = win.get_window()
+    if window:
+        window.set_role("countdown_timer")
+    return win
+
+
+def main():
+    try:
+        win = create_window()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    win.connect('destroy', Gtk.main_quit)
+    Gtk.main()
+
@@ -0,0 +1,214 @@
+"""
+Day dot grids for the year progress widget
+Bulk layout and colouring, batched fills, cached surfaces and constant-time hit-testing
+"""
+
+import datetime
+import math
+
+import cairo
+
+# Dot levels, each drawn in one colour
+FUTURE = 0
+PAST = 1
+TODAY = 2
+EMPTY = 3  # Past day with nothing completed
+DONE_1 = 4  # Up to a quarter of the resolutions completed
+DONE_4 = 7  # Every resolution completed
+
+LEVEL_COLORS = (
+    (0.3, 0.3, 0.3, 0.5),
+    (1, 1, 1, 0.9),
+    (0.2, 0.8, 0.2, 1.0),
+    (1, 1, 1, 0.2),
+    (0.2, 0.5, 0.2, 0.6),
+    (0.2, 0.6, 0.2, 0.75),
+    (0.2, 0.7, 0.2, 0.9),
+    (0.3, 0.9, 0.3, 1.0),
+)
+
+VECTOR_SURFACES = (cairo.SVGSurface, cairo.PDFSurface, cairo.PSSurface)
+
+
+def day_bits(first_ordinal, count, completions):
+    """Get a list with the bitmask of completed resolutions of every day from first_ordinal on
+
+    Built with a single pass over the completions, so later recolouring for
+    another set of resolutions never has to look at the history again.
+    """
+    bits = [0] * count
+    for key, done in completions.items():
+        try:
+            i = datetime.date.fromisoformat(key).toordinal() - first_ordinal
+        except ValueError:
+            continue
+        if 0 <= i < count:
+            bits[i] = sum(1 << j for j, completed in enumerate(done) if completed)
+    return bits
+
+
+def day_levels(first_ordinal, count, today_ordinal, bits=None, mask=0):
+    """Get a bytearray with the level of every day from first_ordinal on
+
+    Without bits past days are PAST. With bits they are EMPTY or one of the
+    DONE levels by the share of the resolutions in `mask` completed that day.
+    """
+    levels = bytearray(count)
+    past = min(max(today_ordinal - first_ordinal, 0), count)
+    levels[:past] = bytes([PAST if bits is None else EMPTY]) * past
+
+    if bits is not None and mask:
+        total = mask.bit_count()
+        for i in range(past):
+            completed = (bits[i] & mask).bit_count()
+            if completed:
+                levels[i] = DONE_1 + min(3, (4 * completed - 1) // total)
+
+    if 0 <= today_ordinal - first_ordinal < count:
+        levels[today_ordinal - first_ordinal] = TODAY
+    return levels
+
+
+class DayGrid:
+    """Dots for every day of one or more consecutive years
+
+    Each year is a block of `rows` rows of `cols` dots, with `year_gap` pixels
+    between blocks. Days are addressed by their index from January 1st of the
+    first year. The dots are painted over `background` into a cached
+    surface, one fill per colour, and only repainted when the levels or the
+    scale change.
+    """
+
+    def __init__(self, x, y, cols, rows, spacing, radius, background, year_gap=0):
+        self.x = x
+        self.y = y
+        self.cols = cols
+        self.rows = rows
+        self.spacing = spacing
+        self.radius = radius
+        self.background = background
+        self.year_height = rows * spacing + year_gap
+        self.years = None
+        self.bits = None  # Per-day completion bitmasks, see day_bits()
+        self.bits_key = None
+        self.levels = bytearray()
+        self.level_counts = [0] * len(LEVEL_COLORS)  # Days at each level, counted once per change
+        self.levels_key = None  # What the bits and levels were computed from, kept by the owner
+        self.surface = None
+        self.surface_scale = None
+
+    def set_years(self, first_year, count):
+        """Lay out the days of `count` years starting at first_year"""
+        if self.years == (first_year, count):
+            return
+        self.years = (first_year, count)
+        self.first_ordinal = datetime.date(first_year, 1, 1).toordinal()
+        self.year_starts = [datetime.date(first_year + i, 1, 1).toordinal() - self.first_ordinal
+                            for i in range(count + 1)]
+        self.total = self.year_starts[-1]
+
+        # Dot centres, computed once per layout
+        xs = []
+        ys = []
+        for block in range(count):
+            top = self.y + block * self.year_height
+            for day in range(self.year_starts[block + 1] - self.year_starts[block]):
+                xs.append(self.x + (day % self.cols) * self.spacing)
+                ys.append(top + (day // self.cols) * self.spacing)
+        self.xs = xs
+        self.ys = ys
+        self.set_levels(bytearray(self.total))
+        self.surface = None
+
+    def set_levels(self, levels):
+        if levels != self.levels:
+            self.levels = levels
+            self.level_counts = [levels.count(level) for level in range(len(LEVEL_COLORS))]
+            self.surface = None
+
+    def count(self, first_level, last_level=None):
+        """Get the number of days from first_level to last_level, from the cached counts"""
+        return sum(self.level_counts[first_level:(first_level if last_level is None else last_level) + 1])
+
+    def center(self, index):
+        return self.xs[index], self.ys[index]
+
+    def date_of(self, index):
+        return datetime.date.fromordinal(self.first_ordinal + index)
+
+    def block_top(self, block):
+        """Get the y of the first row of a year block"""
+        return self.y + block * self.year_height
+
+    def index_at(self, x, y):
+        """Get the index of the day whose dot is under a point, in constant time"""
+        if self.years is None:
+            return None
+        block = int((y - self.y + self.spacing / 2) // self.year_height)
+        if not 0 <= block < self.years[1]:
+            return None
+        col = round((x - self.x) / self.spacing)
+        row = round((y - self.block_top(block)) / self.spacing)
+        if not 0 <= col < self.cols or not 0 <= row < self.rows:
+            return None
+        index = self.year_starts[block] + row * self.cols + col
+        if index >= self.year_starts[block + 1]:
+            return None
+        if math.hypot(x - self.xs[index], y - self.ys[index]) > self.radius + min(2, self.spacing / 2):
+            return None
+        return index
+
+    def bounds(self):
+        """Get the whole-pixel rectangle covering every dot"""
+        pad = self.radius + 1
+        x = math.floor(self.x - pad)
+        y = math.floor(self.y - pad)
+        right = self.x + (self.cols - 1) * self.spacing + pad
+        bottom = self.block_top(self.years[1] - 1) + (self.rows - 1) * self.spacing + pad
+        return (x, y, math.ceil(right) - x, math.ceil(bottom) - y)
+
+    def paint_dots(self, cr):
+        """Fill the background and the dots, one path and one fill per colour"""
+        cr.set_source_rgba(*self.background)
+        cr.rectangle(*self.bounds())
+        cr.fill()
+
+        radius = self.radius
+        xs = self.xs
+        ys = self.ys
+        by_level = {}
+        for index, level in enumerate(self.levels):
+            by_level.setdefault(level, []).append(index)
+
+        for level, indices in by_level.items():
+            cr.new_path()
+            for i in indices:
+                cr.move_to(xs[i] + radius, ys[i])
+                cr.arc(xs[i], ys[i], radius, 0, 2 * math.pi)
+            cr.set_source_rgba(*LEVEL_COLORS[level])
+            cr.fill()
+
+    def draw(self, cr):
+        """Draw the dots from the cached surface, repainting it if needed"""
+        if isinstance(cr.get_target(), VECTOR_SURFACES):
+            # Keep vector output sharp
+            self.paint_dots(cr)
+            return
+
+        x, y, width, height = self.bounds()
+        m = cr.get_matrix()
+        scale = (m.xx, m.yy)
+        if self.surface is None or self.surface_scale != scale:
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32,
+                                         math.ceil(width * m.xx), math.ceil(height * m.yy))
+            surface.set_device_scale(m.xx, m.yy)
+            surface_cr = cairo.Context(surface)
+            surface_cr.set_operator(cairo.OPERATOR_SOURCE)
+            surface_cr.translate(-x, -y)
+            self.paint_dots(surface_cr)
+            self.surface = surface
+            self.surface_scale = scale
+
+        cr.set_source_surface(self.surface, x, y)
+        cr.rectangle(x, y, width, height)
+        cr.fill()
@@ -0,0 +1,117 @@
+"""
+Day rollover scheduling for the desktop widgets
+Wall-clock midnight detection that survives suspend, clock steps and timezone changes
+"""
+
+import ctypes
+import ctypes.util
+import datetime
+import os
+import time
+
+MAX_SLEEP = 900  # Re-check the date at least this often, in case a wakeup is missed
+LOCALTIME = '/etc/localtime'  # Replaced when the timezone is changed
+
+# timerfd constants from <sys/timerfd.h>
+CLOCK_REALTIME = 0
+TFD_CLOEXEC = 0o2000000
+TFD_NONBLOCK = 0o4000
+TFD_TIMER_ABSTIME = 1
+TFD_TIMER_CANCEL_ON_SET = 2
+
+
+def next_midnight(now):
+    """Get the local midnight following a datetime"""
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+
+
+class DayScheduler:
+    """Notice when the local date changes
+
+    The scheduler owns no timers. The host arms one for seconds_until_check()
+    and calls check() from it, and also on resume and on clock or timezone
+    changes. `clock` returns the current local datetime, so a fake clock can
+    stand in for the real one.
+    """
+
+    def __init__(self, on_new_day, clock=None):
+        self.on_new_day = on_new_day  # Called as on_new_day(old_date, new_date)
+        self.clock = clock or datetime.datetime.now
+        self.today = self.clock().date()
+
+    def seconds_until_midnight(self):
+        now = self.clock()
+        return (next_midnight(now) - now).total_seconds()
+
+    def seconds_until_check(self):
+        """Whole seconds to wait before the next check, landing just after midnight"""
+        return max(1, min(int(self.seconds_until_midnight()) + 1, MAX_SLEEP))
+
+    def check(self):
+        """Compare the date with the last check, return True if it changed"""
+        today = self.clock().date()
+        if today == self.today:
+            return False
+        old, self.today = self.today, today
+        self.on_new_day(old, today)
+        return True
+
+
+class timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+class itimerspec(ctypes.Structure):
+    _fields_ = [('it_interval', timespec), ('it_value', timespec)]
+
+
+class WallClockAlarm:
+    """A timerfd on CLOCK_REALTIME for waking at a wall-clock time
+
+    An absolute realtime timer still fires after a suspend that slept through
+    its expiry, and TFD_TIMER_CANCEL_ON_SET also makes the fd readable when
+    the clock is stepped. fileno() is None where timerfd is unavailable.
+    """
+
+    def __init__(self):
+        self.fd = None
+        self.libc = None
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            return
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.timerfd_create(CLOCK_REALTIME, TFD_CLOEXEC | TFD_NONBLOCK)
+            if fd < 0:
+                return
+            self.libc = libc
+            self.fd = fd
+        except (AttributeError, OSError):
+            self.fd = None
+
+    def fileno(self):
+        return self.fd
+
+    def arm_at(self, when):
+        """Fire at a local datetime, or as soon as the clock is set"""
+        if self.fd is None:
+            return
+        seconds = time.mktime(when.timetuple())
+        spec = itimerspec(it_value=timespec(int(seconds), 0))
+        if self.libc.timerfd_settime(self.fd, TFD_TIMER_ABSTIME | TFD_TIMER_CANCEL_ON_SET,
+                                     ctypes.byref(spec), None) < 0:
+            # Older kernels reject CANCEL_ON_SET, keep the plain alarm
+            self.libc.timerfd_settime(self.fd, TFD_TIMER_ABSTIME, ctypes.byref(spec), None)
+
+    def acknowledge(self):
+        """Drain the fd after it became readable"""
+        try:
+            os.read(self.fd, 8)
+        except OSError:
+            # ECANCELED after a clock step, EAGAIN if already drained
+            pass
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
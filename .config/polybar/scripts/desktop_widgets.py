@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Desktop widget host for i3wm
+Runs the desktop widgets as windows of one process, loading GTK once for all of them
+
+Usage:
+    desktop_widgets.py            run the widgets enabled in ~/.config/desktop_widgets.json,
+                                  e.g. {"widgets": ["year_progress", "countdown"]}
+    desktop_widgets.py countdown  run the named widgets instead
+    desktop_widgets.py --list     print the available widgets
+
+Startup time and memory of each widget are printed once all of them have
+drawn, and appended to ~/.cache/desktop_widgets_startup.log.
+"""
+
+import argparse
+import sys
+import time
+
+
+def main():
+    started = time.monotonic()
+    parser = argparse.ArgumentParser(description="Desktop widget host")
+    parser.add_argument('widgets', nargs='*', help="widgets to run instead of the configured ones")
+    parser.add_argument('--list', action='store_true', help="print the available widgets")
+    parser.add_argument('--instrument', action='store_true',
+                        help="show a frame-time overlay and log redraw summaries "
+                             "(also DESKTOP_WIDGETS_INSTRUMENT=1)")
+    args = parser.parse_args()
+
+    from widget_host import WIDGETS, run
+    if args.list:
+        print('\n'.join(WIDGETS))
+        return
+
+    unknown = [name for name in args.widgets if name not in WIDGETS]
+    if unknown:
+        parser.error(f"unknown widget: {', '.join(unknown)}")
+    sys.exit(run(args.widgets or None, started, args.instrument))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Frame statistics for the cairo desktop widgets
+Opt-in record of draw durations, redraw causes and damaged area, with an overlay and a log
+"""
+
+import cairo
+import collections
+import json
+import os
+import time
+
+LOG_FILE = os.path.expanduser('~/.cache/desktop_widgets_frames.log')
+ENV_VAR = 'DESKTOP_WIDGETS_INSTRUMENT'
+SUMMARY_INTERVAL = 60  # Seconds between log summaries
+OVERLAY_WIDTH = 130
+OVERLAY_HEIGHT = 41
+
+
+def instrumentation_enabled():
+    """Check the opt-in environment variable"""
+    return os.environ.get(ENV_VAR, '') not in ('', '0')
+
+
+class FrameStats:
+    """Frame timings for one widget
+
+    Call note_cause() when queueing a redraw, then frame() from the draw
+    handler. Causes queued between two frames are attributed to the next one.
+    """
+
+    def __init__(self, name, log_file=None, window=5.0):
+        self.name = name
+        self.log_file = log_file or LOG_FILE
+        self.window = window  # Seconds covered by the redraws-per-second figure
+        self.pending_causes = set()
+        self.recent = collections.deque()  # (time, duration_ms, damage_px)
+        self.reset_period()
+
+    def reset_period(self):
+        """Start a new summary period"""
+        self.period_start = time.monotonic()
+        self.frames = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.total_damage = 0
+        self.causes = collections.Counter()
+
+    def note_cause(self, cause):
+        self.pending_causes.add(cause)
+
+    def frame(self, duration_ms, damage_px):
+        """Record a finished frame"""
+        now = time.monotonic()
+        causes = self.pending_causes or {'expose'}
+        self.pending_causes = set()
+
+        self.frames += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.total_damage += damage_px
+        self.causes.update(causes)
+
+        self.recent.append((now, duration_ms, damage_px))
+        while self.recent and self.recent[0][0] < now - self.window:
+            self.recent.popleft()
+
+    def redraws_per_second(self):
+        return len(self.recent) / self.window
+
+    def overlay_lines(self):
+        """Short lines for the on-screen overlay"""
+        if not self.recent:
+            return ["no frames"]
+        _, last_ms, last_damage = self.recent[-1]
+        average_ms = sum(r[1] for r in self.recent) / len(self.recent)
+        return [
+            f"{self.redraws_per_second():.1f} redraws/s",
+            f"draw {last_ms:.2f} ms (avg {average_ms:.2f})",
+            f"damage {last_damage} px",
+        ]
+
+    def summary(self):
+        """Summary of the current period"""
+        elapsed = max(time.monotonic() - self.period_start, 1e-9)
+        return {
+            'widget': self.name,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'period_s': round(elapsed, 1),
+            'frames': self.frames,
+            'redraws_per_s': round(self.frames / elapsed, 2),
+            'mean_ms': round(self.total_ms / self.frames, 3) if self.frames else 0,
+            'max_ms': round(self.max_ms, 3),
+            'mean_damage_px': self.total_damage // self.frames if self.frames else 0,
+            'causes': dict(self.causes),
+        }
+
+    def write_summary(self):
+        """Append the period summary to the log as a JSON line and start a new period"""
+        try:
+            os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+            with open(self.log_file, 'a') as f:
+                f.write(json.dumps(self.summary()) + '\n')
+        except OSError:
+            pass
+        self.reset_period()
+
+
+def damage_area(cr):
+    """Get the number of pixels in the context's clip, i.e. the damaged area"""
+    try:
+        return int(sum(r[2] * r[3] for r in cr.copy_clip_rectangle_list()))
+    except cairo.Error:
+        x1, y1, x2, y2 = cr.clip_extents()
+        return int((x2 - x1) * (y2 - y1))
+
+
+def draw_overlay(cr, stats, x, y):
+    """Draw the stats overlay with its top-left corner at (x, y)"""
+    lines = stats.overlay_lines()[:3]
+    cr.save()
+    cr.set_operator(cairo.OPERATOR_OVER)
+    cr.set_source_rgba(0, 0, 0, 0.6)
+    cr.rectangle(x, y, OVERLAY_WIDTH, OVERLAY_HEIGHT)
+    cr.fill()
+    cr.set_source_rgba(1, 1, 0.4, 1)
+    cr.select_font_face("Monospace")
+    cr.set_font_size(9)
+    for i, line in enumerate(lines):
+        cr.move_to(x + 4, y + 13 + 11 * i)
+        cr.show_text(line)
+    cr.restore()
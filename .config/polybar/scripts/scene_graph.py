@@ -0,0 +1,221 @@
+"""
+Retained-mode scene for the cairo desktop widgets
+A node tree with bounds, a spatial hit-test index, dirty-rect invalidation and cached node surfaces
+"""
+
+import math
+
+import cairo
+
+CELL_SIZE = 32  # Side of a hit-test index cell in pixels
+VECTOR_SURFACES = (cairo.SVGSurface, cairo.PDFSurface, cairo.PSSurface)
+
+
+def rounded_rectangle(cr, x, y, width, height, radius):
+    """Add a rounded rectangle path"""
+    cr.new_path()
+    cr.arc(x + radius, y + radius, radius, math.pi, 3 * math.pi / 2)
+    cr.arc(x + width - radius, y + radius, radius, 3 * math.pi / 2, 0)
+    cr.arc(x + width - radius, y + height - radius, radius, 0, math.pi / 2)
+    cr.arc(x + radius, y + height - radius, radius, math.pi / 2, math.pi)
+    cr.close_path()
+
+
+def rect_contains(rect, x, y):
+    rx, ry, rw, rh = rect
+    return rx <= x <= rx + rw and ry <= y <= ry + rh
+
+
+def pixel_rect(rect):
+    """Get the whole-pixel rectangle covering a rectangle"""
+    x, y, width, height = rect
+    left = math.floor(x)
+    top = math.floor(y)
+    return (left, top, math.ceil(x + width) - left, math.ceil(y + height) - top)
+
+
+class Node:
+    """One element of a scene: bounds, painting and optional hit-testing
+
+    `draw(cr)` paints the node in window coordinates and children are drawn
+    after it, on top. With `cache` the painting is kept in a surface of the
+    bounds, filled with `background` first, and only repeated when `key()`
+    or the scale changes or after dirty(); the windows draw with
+    OPERATOR_SOURCE, so the cached pixels replace the area exactly.
+
+    Nodes with `hit` take part in hit-testing: True for the whole bounds,
+    or a function refining (x, y) into a detail such as a day number, None
+    for a miss. `hover_rect(detail)` is the area a hover change redraws,
+    the bounds by default.
+    """
+
+    def __init__(self, name, bounds, draw=None, children=(), cache=False, background=None,
+                 key=None, hit=None, hover_rect=None, visible=None):
+        self.name = name
+        self.bounds = bounds
+        self.draw = draw
+        self.children = list(children)
+        self.cache = cache
+        self.background = background
+        self.key = key or (lambda: None)
+        self.hit = hit
+        self.hover_rect = hover_rect
+        self.visible = visible or (lambda: True)
+        self.surface = None
+        self.surface_key = None
+
+    def walk(self):
+        """Yield the node and its descendants in drawing order"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def dirty(self):
+        """Drop the cached surface"""
+        self.surface = None
+
+    def paint(self, cr):
+        if self.draw is None:
+            return
+        if not self.cache or isinstance(cr.get_target(), VECTOR_SURFACES):
+            # Keep vector output sharp
+            self.draw(cr)
+            return
+
+        # Render at the target's resolution, with the same user matrix so
+        # cached fonts and glyph runs stay valid
+        m = cr.get_matrix()
+        dx, dy = cr.get_target().get_device_scale()
+        key = (self.key(), m.xx, m.yy, dx, dy)
+        x, y, width, height = self.bounds
+        if self.surface is None or self.surface_key != key:
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32,
+                                         max(1, math.ceil(width * m.xx * dx)),
+                                         max(1, math.ceil(height * m.yy * dy)))
+            surface.set_device_scale(dx, dy)
+            surface_cr = cairo.Context(surface)
+            surface_cr.set_operator(cairo.OPERATOR_SOURCE)
+            surface_cr.scale(m.xx, m.yy)
+            surface_cr.translate(-x, -y)
+            if self.background:
+                surface_cr.set_source_rgba(*self.background)
+                surface_cr.rectangle(x, y, width, height)
+                surface_cr.fill()
+            self.draw(surface_cr)
+            self.surface = surface
+            self.surface_key = key
+
+        cr.save()
+        cr.translate(x, y)
+        cr.scale(1 / m.xx, 1 / m.yy)
+        cr.set_source_surface(self.surface, 0, 0)
+        cr.rectangle(0, 0, width * m.xx, height * m.yy)
+        cr.fill()
+        cr.restore()
+
+
+class Scene:
+    """The node tree of the current view, with hover tracking and damage
+
+    Interactive nodes are bucketed into CELL_SIZE cells when a root is
+    first shown, so a pointer lookup only tests the few nodes of its cell.
+    `invalidate(cause, rect)` is called for every area that needs a redraw,
+    e.g. the window's queue_draw_area; the headless renderer has none.
+    """
+
+    def __init__(self, invalidate=None):
+        self.invalidate = invalidate
+        self.root = None
+        self.nodes = {}  # {name: node} of the current root
+        self.cells = {}  # {(col, row): [interactive nodes, topmost first]}
+        self.indexes = {}  # Per root, so switching views does not rebuild
+        self.hover = (None, None)  # (node name, detail) under the pointer
+
+    def set_root(self, root):
+        """Show another view, returns True if it changed"""
+        if root is self.root:
+            return False
+        self.root = root
+        if id(root) not in self.indexes:
+            self.indexes[id(root)] = self.build_index(root)
+        self.nodes, self.cells = self.indexes[id(root)]
+        self.hover = (None, None)
+        return True
+
+    def dirty(self):
+        """Drop the cached surfaces of every view shown so far, e.g. after a font change"""
+        for nodes, _ in self.indexes.values():
+            for node in nodes.values():
+                node.dirty()
+
+    def build_index(self, root):
+        nodes = {}
+        cells = {}
+        for node in root.walk():
+            nodes[node.name] = node
+            if not node.hit:
+                continue
+            x, y, width, height = node.bounds
+            for col in range(int(x // CELL_SIZE), int((x + width) // CELL_SIZE) + 1):
+                for row in range(int(y // CELL_SIZE), int((y + height) // CELL_SIZE) + 1):
+                    # Later nodes are drawn on top, so they are tested first
+                    cells.setdefault((col, row), []).insert(0, node)
+        return nodes, cells
+
+    def hit(self, x, y):
+        """Get (node, detail) of the topmost interactive node under a point"""
+        for node in self.cells.get((int(x // CELL_SIZE), int(y // CELL_SIZE)), ()):
+            if not rect_contains(node.bounds, x, y) or not node.visible():
+                continue
+            if node.hit is True:
+                return node, None
+            detail = node.hit(x, y)
+            if detail is not None:
+                return node, detail
+        return None, None
+
+    def hovered(self, name):
+        return self.hover[0] == name
+
+    def hover_detail(self, name):
+        """Get the hover detail if the pointer is over the named node"""
+        return self.hover[1] if self.hover[0] == name else None
+
+    def set_hover(self, name, detail=None):
+        """Move the hover, damaging only the old and new hovered areas; True if it changed"""
+        if (name, detail) == self.hover:
+            return False
+        old = self.hover
+        self.hover = (name, detail)
+        for hover_name, hover_detail in (old, self.hover):
+            node = self.nodes.get(hover_name)
+            if node is not None:
+                rect = node.hover_rect(hover_detail) if node.hover_rect else node.bounds
+                self.damage_rect(rect, 'hover')
+        return True
+
+    def update_hover(self, x, y):
+        """Hover whatever is under a point; True if the hover changed"""
+        node, detail = self.hit(x, y)
+        return self.set_hover(node.name if node else None, detail)
+
+    def damage_rect(self, rect, cause='damage'):
+        if self.invalidate:
+            self.invalidate(cause, pixel_rect(rect))
+
+    def damage(self, *names, cause='damage'):
+        """Redraw the named nodes of the current view"""
+        for name in names:
+            node = self.nodes.get(name)
+            if node is not None:
+                self.damage_rect(node.bounds, cause)
+
+    def draw(self, cr):
+        """Paint the visible nodes that intersect the clip"""
+        x1, y1, x2, y2 = cr.clip_extents()
+        for node in self.root.walk():
+            x, y, width, height = node.bounds
+            if x > x2 or y > y2 or x + width < x1 or y + height < y1:
+                continue
+            if node.visible():
+                node.paint(cr)
@@ -0,0 +1,81 @@
+"""
+Stopwatch model
+Count-up time with laps on the monotonic nanosecond clock, without any GTK or cairo imports
+"""
+
+import array
+
+MAX_LAPS = 100  # Laps kept, the oldest are overwritten
+TENTH_NS = 100_000_000
+
+
+def format_tenths(ns):
+    """Format nanoseconds as MM:SS.t, or H:MM:SS.t from an hour on"""
+    seconds, tenth = divmod(ns // TENTH_NS, 10)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}.{tenth}"
+    return f"{minutes:02d}:{seconds:02d}.{tenth}"
+
+
+class Stopwatch:
+    """A count-up stopwatch that stores its start time instead of counting ticks
+
+    Like Countdown, the elapsed time is always derived from the clock, here
+    integer nanoseconds from time.monotonic_ns(), so it never drifts or
+    rounds. Laps are split times in a preallocated ring buffer, so recording
+    one never allocates.
+    """
+
+    def __init__(self, max_laps=MAX_LAPS):
+        self.started_ns = None  # Clock reading the elapsed time counts from while running
+        self.stopped_ns = 0  # Elapsed time while paused
+        self.splits = array.array('q', bytes(8 * max_laps))
+        self.lap_count = 0  # Laps since the reset, may exceed the buffer
+
+    @property
+    def running(self):
+        return self.started_ns is not None
+
+    def elapsed_ns(self, now_ns):
+        if self.started_ns is None:
+            return self.stopped_ns
+        return now_ns - self.started_ns
+
+    def next_change_in_ns(self, now_ns):
+        """Get the time until the shown tenth changes"""
+        return TENTH_NS - self.elapsed_ns(now_ns) % TENTH_NS
+
+    def start(self, now_ns):
+        if self.started_ns is None:
+            self.started_ns = now_ns - self.stopped_ns
+
+    def pause(self, now_ns):
+        if self.started_ns is not None:
+            self.stopped_ns = now_ns - self.started_ns
+            self.started_ns = None
+
+    def reset(self):
+        self.started_ns = None
+        self.stopped_ns = 0
+        self.lap_count = 0
+
+    def lap(self, now_ns):
+        """Record the current split time"""
+        self.splits[self.lap_count % len(self.splits)] = self.elapsed_ns(now_ns)
+        self.lap_count += 1
+
+    def recent_laps(self, count):
+        """Get (number, lap time, split time) of up to `count` newest laps, newest first
+
+        Only laps whose previous split is still in the buffer are returned.
+        """
+        size = len(self.splits)
+        first = max(1, self.lap_count - min(count, size - 1) + 1)
+        laps = []
+        for number in range(self.lap_count, first - 1, -1):
+            split = self.splits[(number - 1) % size]
+            previous = self.splits[(number - 2) % size] if number > 1 else 0
+            laps.append((number, split - previous, split))
+        return laps
@@ -0,0 +1,118 @@
+"""
+Text cache for the cairo desktop widgets
+Keeps ScaledFont objects and pre-shaped glyph runs so redraws skip font selection and shaping
+"""
+
+import cairo
+
+
+class TextCache:
+    """Cache of scaled fonts and glyph runs
+
+    Fonts are described by (family, slant, weight, size) tuples. Runs are
+    shaped once at the origin and translated into place when drawn. All of it
+    is dropped when the context's transform or the font options change,
+    e.g. on a DPI or scale change.
+    """
+
+    def __init__(self, max_runs=512):
+        self.max_runs = max_runs
+        self.font_options = cairo.FontOptions()
+        self.matrix_key = None
+        self.fonts = {}
+        self.runs = {}
+        self.chars = {}
+
+    def clear(self):
+        self.fonts.clear()
+        self.runs.clear()
+        self.chars.clear()
+
+    def set_font_options(self, options):
+        """Use new font options (antialiasing, hinting), dropping cached fonts"""
+        options = options or cairo.FontOptions()
+        if options != self.font_options:
+            self.font_options = options
+            self.clear()
+
+    def check_context(self, cr):
+        """Drop cached fonts if the context is scaled differently from last time"""
+        m = cr.get_matrix()
+        key = (m.xx, m.yx, m.xy, m.yy)
+        if key != self.matrix_key:
+            self.matrix_key = key
+            self.clear()
+
+    def font(self, cr, spec):
+        """Get the scaled font for a (family, slant, weight, size) spec and select it"""
+        font = self.fonts.get(spec)
+        if font is None:
+            family, slant, weight, size = spec
+            xx, yx, xy, yy = self.matrix_key or (1, 0, 0, 1)
+            font = cairo.ScaledFont(cairo.ToyFontFace(family, slant, weight),
+                                    cairo.Matrix(xx=size, yy=size),
+                                    cairo.Matrix(xx, yx, xy, yy, 0, 0),
+                                    self.font_options)
+            self.fonts[spec] = font
+        cr.set_scaled_font(font)
+        return font
+
+    def run(self, cr, spec, text):
+        """Get (glyphs, extents) for text shaped at the origin"""
+        key = (spec, text)
+        run = self.runs.get(key)
+        if run is None:
+            font = self.fonts.get(spec) or self.font(cr, spec)
+            glyphs = font.text_to_glyphs(0, 0, text, False) if text else []
+            run = (glyphs, font.text_extents(text))
+            if len(self.runs) >= self.max_runs:
+                self.runs.clear()
+            self.runs[key] = run
+        return run
+
+    def char_glyph(self, cr, spec, char):
+        """Get (glyph index, advance) of a single character"""
+        key = (spec, char)
+        entry = self.chars.get(key)
+        if entry is None:
+            font = self.fonts.get(spec) or self.font(cr, spec)
+            glyphs = font.text_to_glyphs(0, 0, char, False)
+            entry = (glyphs[0][0] if glyphs else 0, font.text_extents(char).x_advance)
+            self.chars[key] = entry
+        return entry
+
+    def fixed_width(self, cr, spec, text):
+        """Get the advance width of text drawn with show_fixed()"""
+        return sum(self.char_glyph(cr, spec, char)[1] for char in text)
+
+    def show_fixed(self, cr, spec, text, x, y):
+        """Draw text from per-character glyphs, e.g. fixed-width digits
+
+        Characters are shaped once and placed by their advances, so a string
+        that was never drawn before costs no shaping.
+        """
+        glyphs = []
+        for char in text:
+            index, advance = self.char_glyph(cr, spec, char)
+            glyphs.append(cairo.Glyph(index, x, y))
+            x += advance
+        self.font(cr, spec)
+        cr.show_glyphs(glyphs)
+
+    def discard(self, spec, text):
+        """Drop a run that will not be drawn again"""
+        self.runs.pop((spec, text), None)
+
+    def extents(self, cr, spec, text):
+        """Get the text extents of a run"""
+        return self.run(cr, spec, text)[1]
+
+    def show(self, cr, spec, text, x, y):
+        """Draw text with its baseline origin at (x, y)"""
+        glyphs = self.run(cr, spec, text)[0]
+        if not glyphs:
+            return
+        self.font(cr, spec)
+        cr.translate(x, y)
+        cr.show_glyphs(glyphs)
+        cr.translate(-x, -y)
@@ -0,0 +1,151 @@
+"""
+Desktop widget host
+Runs every enabled desktop widget as a window of one GTK process and main loop
+"""
+
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk
+import json
+import os
+import resource
+import sys
+import time
+
+CONFIG_FILE = os.path.expanduser('~/.config/desktop_widgets.json')
+REPORT_FILE = os.path.expanduser('~/.cache/desktop_widgets_startup.log')
+DEFAULT_WIDGETS = ['year_progress']
+
+
+def open_year_progress(started, instrument):
+    from year_progress_widget import create_window
+    return create_window(None, started, instrument)
+
+
+def open_countdown(started, instrument):
+    from countdown_widget import create_window
+    return create_window()
+
+
+# Each widget module is imported only when enabled, so its import counts towards its own startup
+WIDGETS = {
+    'year_progress': open_year_progress,
+    'countdown': open_countdown,
+}
+
+
+def load_config(path=None):
+    """Read the enabled widgets, e.g. {"widgets": ["year_progress", "countdown"]}"""
+    names = DEFAULT_WIDGETS
+    try:
+        with open(path or CONFIG_FILE) as f:
+            data = json.load(f)
+        if isinstance(data.get('widgets'), list):
+            names = data['widgets']
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Error loading widget config: {e}", file=sys.stderr)
+
+    enabled = []
+    for name in names:
+        if name not in WIDGETS:
+            print(f"Unknown widget: {name}", file=sys.stderr)
+        elif name not in enabled:
+            enabled.append(name)
+    return enabled
+
+
+def resident_kb():
+    """Get the resident set size of the process in KiB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current size, but it still grows with each widget
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class WidgetHost:
+    """The enabled widgets as windows of this process, with their startup costs
+
+    GTK, cairo and the X connection are loaded once, before any widget. The
+    widgets are then imported and created one after the other, so the time
+    taken and the growth of the resident set meanwhile are each widget's
+    own. First frames are timed from the start of the widget's creation.
+    """
+
+    def __init__(self, names, started, instrument=False, report_file=None):
+        self.windows = []
+        self.pending = {}  # {name: draw handler id} of widgets yet to draw
+        self.report_file = report_file or REPORT_FILE
+        self.report = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'host': {'gtk_ms': round((time.monotonic() - started) * 1000, 1),
+                     'rss_kb': resident_kb()},
+            'widgets': {},
+        }
+        for name in names:
+            self.open_widget(name, instrument)
+        if not self.pending:
+            self.write_report()
+
+    def open_widget(self, name, instrument):
+        """Create one widget, measuring what it adds"""
+        began = time.monotonic()
+        rss_before = resident_kb()
+        try:
+            window = WIDGETS[name](began, instrument)
+        except Exception as e:
+            # Keep the other widgets running
+            print(f"Error starting {name}: {e}", file=sys.stderr)
+            return
+
+        self.report['widgets'][name] = {
+            'create_ms': round((time.monotonic() - began) * 1000, 1),
+            'rss_kb': resident_kb() - rss_before,
+            'first_frame_ms': None,
+        }
+        self.windows.append(window)
+        window.connect('destroy', self.on_window_destroyed)
+        self.pending[name] = window.connect_after('draw', self.on_first_draw, name, began)
+
+    def on_first_draw(self, window, cr, name, began):
+        self.report['widgets'][name]['first_frame_ms'] = round((time.monotonic() - began) * 1000, 1)
+        window.disconnect(self.pending.pop(name))
+        if not self.pending:
+            self.write_report()
+        return False
+
+    def on_window_destroyed(self, window):
+        self.windows.remove(window)
+        if not self.windows:
+            Gtk.main_quit()
+
+    def write_report(self):
+        """Print the startup costs and append them to the log as a JSON line"""
+        self.report['host']['total_rss_kb'] = resident_kb()
+        host = self.report['host']
+        print(f"host: GTK loaded in {host['gtk_ms']:.0f} ms, {host['rss_kb'] / 1024:.1f} MB")
+        for name, stats in self.report['widgets'].items():
+            print(f"{name}: created in {stats['create_ms']:.0f} ms, "
+                  f"first frame at {stats['first_frame_ms']:.0f} ms, +{stats['rss_kb'] / 1024:.1f} MB")
+        print(f"total: {host['total_rss_kb'] / 1024:.1f} MB")
+        sys.stdout.flush()
+
+        try:
+            os.makedirs(os.path.dirname(self.report_file), exist_ok=True)
+            with open(self.report_file, 'a') as f:
+                f.write(json.dumps(self.report) + '\n')
+        except OSError:
+            pass
+
+
+def run(names=None, started=None, instrument=False):
+    """Run the widgets, the configured ones by default, until every window is closed"""
+    started = started if started is not None else time.monotonic()
+    host = WidgetHost(load_config() if names is None else names, started, instrument)
+    if not host.windows:
+        return 1
+    Gtk.main()
+    return 0
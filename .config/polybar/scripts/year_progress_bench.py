@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Year Progress benchmark suite
+Times drawing, hit-testing and persistence headless on a cairo ImageSurface
+
+Usage:
+    year_progress_bench.py [-o results.json] [--compare old.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+
+import cairo
+
+from year_progress_render import YearProgressRenderer, WIDTH, HEIGHT
+
+YEARS = (1, 5, 20)
+RESOLUTION_COUNTS = (3, 10, 30)
+CATEGORIES = ('health', 'learning', 'work')
+
+
+def make_data_file(directory, years, resolution_count, seed=0):
+    """Write a synthetic data file covering the last `years` years"""
+    rng = random.Random(seed)
+    resolutions = [f"Resolution {i + 1}" for i in range(resolution_count)]
+    categories = {name: CATEGORIES[i % len(CATEGORIES)] for i, name in enumerate(resolutions)}
+    today = datetime.date.today()
+    completions = {}
+    for offset in range(years * 365):
+        key = (today - datetime.timedelta(days=offset)).strftime('%Y-%m-%d')
+        completions[key] = [rng.random() < 0.6 for _ in resolutions]
+
+    path = os.path.join(directory, f"data_{years}y_{resolution_count}r.json")
+    with open(path, 'w') as f:
+        json.dump({'resolutions': resolutions, 'categories': categories,
+                   'completions': completions}, f, indent=2)
+    return path
+
+
+def time_call(func, runs):
+    """Run func `runs` times, return timing stats in ms"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        'runs': runs,
+        'first_ms': times[0],
+        'min_ms': min(times),
+        'median_ms': statistics.median(times),
+        'mean_ms': statistics.fmean(times),
+    }
+
+
+def pointer_sweep(renderer, step):
+    """Hit-test every point of the window on a `step` pixel grid"""
+    for y in range(0, HEIGHT, step):
+        for x in range(0, WIDTH, step):
+            renderer.hit_test(x, y)
+
+
+def bench_data_set(path, runs, sweep_step):
+    """Time every benchmarked operation against one data file"""
+    renderer = YearProgressRenderer(path)
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, WIDTH, HEIGHT)
+    cr = cairo.Context(surface)
+    renderer.text.check_context(cr)
+
+    results = {}
+
+    renderer.view_mode = 'main'
+    results['draw_main_view'] = time_call(lambda: renderer.draw(cr), runs)
+
+    renderer.view_mode = 'day_view'
+    renderer.viewing_day = renderer.current_day
+    results['draw_day_view'] = time_call(lambda: renderer.draw(cr), runs)
+
+    renderer.view_mode = 'decade'
+    results['draw_decade_view'] = time_call(lambda: renderer.draw(cr), runs)
+
+    def switch_filter():
+        renderer.cycle_category_filter()
+        renderer.draw(cr)
+    results['switch_category_filter'] = time_call(switch_filter, runs)
+    renderer.category_filter = None
+
+    results['decade_hit_test_sweep'] = time_call(lambda: pointer_sweep(renderer, sweep_step),
+                                                 max(1, runs // 10))
+
+    renderer.view_mode = 'settings'
+    renderer.editor.set_text('\n'.join(renderer.resolutions))
+    renderer.scroll_to_cursor()
+    results['draw_settings_view'] = time_call(lambda: renderer.draw(cr), runs)
+
+    renderer.view_mode = 'main'
+    results['hit_test_sweep'] = time_call(lambda: pointer_sweep(renderer, sweep_step),
+                                          max(1, runs // 10))
+    results['hit_test_sweep']['points'] = len(range(0, HEIGHT, sweep_step)) * len(range(0, WIDTH, sweep_step))
+
+    results['load_data'] = time_call(renderer.load_data, max(1, runs // 10))
+    results['save_data'] = time_call(renderer.save_data, max(1, runs // 10))
+    return results
+
+
+def compare(results, baseline):
+    """Print the change of each median against a previous results file"""
+    old = {(r['years'], r['resolutions'], r['op']): r for r in baseline['results']}
+    for r in results['results']:
+        before = old.get((r['years'], r['resolutions'], r['op']))
+        if not before:
+            continue
+        ratio = r['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        print(f"{r['op']:<22} {r['years']:>2}y {r['resolutions']:>2}r  "
+              f"{before['median_ms']:9.3f} -> {r['median_ms']:9.3f} ms  ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Year progress benchmark suite")
+    parser.add_argument('-o', '--output', default='year_progress_bench.json',
+                        help="where to write the JSON results")
+    parser.add_argument('--runs', type=int, default=50, help="repetitions per draw")
+    parser.add_argument('--sweep-step', type=int, default=2,
+                        help="pixel step of the hover hit-test sweep")
+    parser.add_argument('--compare', metavar='JSON', help="previous results to compare against")
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cairo': cairo.cairo_version_string(),
+        'results': [],
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for years in YEARS:
+            for resolution_count in RESOLUTION_COUNTS:
+                path = make_data_file(directory, years, resolution_count)
+                timings = bench_data_set(path, args.runs, args.sweep_step)
+                for op, stats in timings.items():
+                    results['results'].append(
+                        dict(years=years, resolutions=resolution_count, op=op, **stats))
+                    print(f"{op:<22} {years:>2}y {resolution_count:>2}r  "
+                          f"median {stats['median_ms']:9.3f} ms")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Year Progress control socket
+A local unix socket on the running widget plus the client used by `s4.py toggle/status`
+"""
+
+import fcntl
+import json
+import os
+import socket
+import sys
+
+from year_progress_data import YearProgressData
+
+RUNTIME_DIR = os.environ.get('XDG_RUNTIME_DIR') or f"/tmp/year-progress-{os.getuid()}"
+SOCKET_PATH = os.path.join(RUNTIME_DIR, 'year_progress.sock')
+LOCK_PATH = SOCKET_PATH + '.lock'  # Held by the widget owning the socket
+CLIENT_TIMEOUT = 2  # Seconds to wait for the widget to answer
+
+
+def handle_request(data, request):
+    """Apply a request to the data, return (response, changed)
+
+    A request naming a `data_file` is refused unless it is the one loaded.
+    """
+    command = request.get('command')
+    data_file = request.get('data_file')
+    if data_file is not None and os.path.realpath(data_file) != os.path.realpath(data.data_file):
+        return {'ok': False, 'other_file': True,
+                'error': f"The widget uses {data.data_file}, not {data_file}"}, False
+
+    if command == 'status':
+        return {'ok': True, 'status': data.get_status()}, False
+
+    if command == 'toggle':
+        index = data.find_resolution(str(request.get('name', '')))
+        if index is None:
+            return {'ok': False, 'error': f"Unknown resolution: {request.get('name')}"}, False
+        done = data.toggle_today(index)
+        return {'ok': True, 'name': data.resolutions[index], 'done': done}, True
+
+    return {'ok': False, 'error': f"Unknown command: {command}"}, False
+
+
+class ServerSocket(socket.socket):
+    """The listening socket, holding the ownership lock until it is closed"""
+
+    lock = None
+
+    def close(self):
+        """Stop listening, removing the socket file before giving up the lock"""
+        super().close()
+        if self.lock is not None:
+            try:
+                os.unlink(SOCKET_PATH)
+            except OSError:
+                pass
+            self.lock.close()
+            self.lock = None
+
+
+def create_server_socket():
+    """Create the listening socket for the widget, or None if another widget owns it
+
+    Ownership is an flock on LOCK_PATH, so two widgets starting at once
+    never both bind, and a socket file left without a lock is stale.
+    """
+    os.makedirs(RUNTIME_DIR, mode=0o700, exist_ok=True)
+    lock = open(LOCK_PATH, 'a')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+
+    server = ServerSocket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.lock = lock
+    server.bind(SOCKET_PATH)
+    server.listen(4)
+    server.setblocking(False)
+    return server
+
+
+def serve_request(server, data):
+    """Answer one pending client on the server socket, return True if data changed"""
+    try:
+        conn, _ = server.accept()
+    except BlockingIOError:
+        return False
+
+    changed = False
+    with conn:
+        conn.settimeout(CLIENT_TIMEOUT)
+        try:
+            line = conn.makefile('rb').readline()
+            response, changed = handle_request(data, json.loads(line))
+        except (OSError, ValueError) as e:
+            response = {'ok': False, 'error': str(e)}
+        try:
+            conn.sendall(json.dumps(response).encode() + b'\n')
+        except OSError:
+            pass
+    return changed
+
+
+def send_request(request):
+    """Send a request to the running widget, return its response or None if not running"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CLIENT_TIMEOUT)
+            client.connect(SOCKET_PATH)
+            client.sendall(json.dumps(request).encode() + b'\n')
+            line = client.makefile('rb').readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def run_request(request, data_file=None):
+    """Send a request to the widget, or apply it to the data file when it is not running
+
+    With `data_file`, the widget only answers if it runs on that file,
+    otherwise the file is edited directly.
+    """
+    if data_file:
+        request = dict(request, data_file=os.path.abspath(data_file))
+    response = send_request(request)
+    if response is not None and not response.get('other_file'):
+        return response
+
+    data = YearProgressData(data_file, load=False)
+    with data.locked():
+        # Re-read under the lock so concurrent writers are not overwritten
+        data.load_data()
+        response, _ = handle_request(data, request)
+    return response
+
+
+def print_response(response, as_json=False):
+    """Print a response for the command line, return the exit status"""
+    if as_json:
+        print(json.dumps(response))
+    elif not response.get('ok'):
+        print(response.get('error'), file=sys.stderr)
+    elif 'status' in response:
+        status = response['status']
+        print(f"Day {status['day']} of {status['total_days']} ({status['progress']:.1f}%)")
+        for resolution in status['resolutions']:
+            mark = '♥' if resolution['done'] else '♡'
+            print(f"{mark} {resolution['name']}")
+    else:
+        print(f"{response['name']}: {'done' if response['done'] else 'not done'}")
+    return 0 if response.get('ok') else 1
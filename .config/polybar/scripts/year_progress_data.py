@@ -0,0 +1,350 @@
+"""
+Year Progress data model
+Resolutions, daily completions and year progress, without any GTK or cairo imports
+"""
+
+import contextlib
+import datetime
+import fcntl
+import json
+import os
+import re
+import sys
+
+DATA_FILE = os.path.expanduser('~/.config/year_progress_data.json')
+DEFAULT_RESOLUTIONS = ["Exercise", "Read", "Meditate"]
+CATEGORY_TAG = re.compile(r'(.*\S)\s+#(\S+)$')  # "Name #category" in the editor
+
+
+def validate_data(data):
+    """Check loaded JSON, return (resolutions, completions, categories) with defaults for bad parts"""
+    resolutions = list(DEFAULT_RESOLUTIONS)  # Default resolutions
+    completions = {}  # {date_str: [True, False, True, ...]}
+    categories = {}  # {resolution: category}
+
+    if isinstance(data, dict):
+        if isinstance(data.get('resolutions'), list):
+            resolutions = [str(name) for name in data['resolutions']]
+        if isinstance(data.get('completions'), dict):
+            completions = {
+                str(key): [bool(done) for done in value]
+                for key, value in data['completions'].items()
+                if isinstance(value, list)
+            }
+        if isinstance(data.get('categories'), dict):
+            categories = {
+                str(name): str(category)
+                for name, category in data['categories'].items()
+                if category
+            }
+    return resolutions, completions, categories
+
+
+def write_json(path, data):
+    """Write data as JSON through a temp file and a rename, so readers never see a partial file"""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def completions_by_name(resolutions, done):
+    """Map each resolution name to its completion in `done`, a list in the order of `resolutions`"""
+    return {name: bool(done[i]) for i, name in reversed(list(enumerate(resolutions))) if i < len(done)}
+
+
+def parse_resolution_line(line):
+    """Split an editor line like "Run 5k #health" into (name, category)"""
+    match = CATEGORY_TAG.match(line.strip())
+    if match:
+        return match.group(1), match.group(2)
+    return line.strip(), None
+
+
+def format_resolution_line(name, category):
+    return f"{name} #{category}" if category else name
+
+
+class YearProgressData:
+    def __init__(self, data_file=None, load=True):
+        # Data file path
+        self.data_file = data_file or DATA_FILE
+        self.lock_fd = None
+        self.data_version = 0  # Bumped whenever resolutions or completions may have changed
+        self.masks_version = None  # data_version the category masks were built for
+        self.conflict_file = None  # Where the disk side of the last unresolved conflict was saved
+
+        # Load data, or start empty and let the caller apply_data() later
+        if load:
+            self.load_data()
+        else:
+            self.resolutions = []
+            self.completions = {}
+            self.categories = {}
+            self.take_snapshot()
+        self.data_loaded = load
+
+        # Calculate year data
+        self.update_year_data()
+
+    def load_data(self):
+        """Load resolutions and completion data from file"""
+        self.apply_data(self.parse_data())
+
+    def parse_data(self):
+        """Read and validate the data file, safe to call from a worker thread"""
+        signature = self.file_signature()
+        resolutions, completions, categories = validate_data(self.read_data_file())
+        return resolutions, completions, categories, signature
+
+    def apply_data(self, parsed):
+        """Swap in data returned by parse_data()"""
+        self.resolutions, self.completions, self.categories, signature = parsed
+        self.data_version += 1
+        self.take_snapshot()
+        self.base_signature = signature
+        self.data_loaded = True
+
+    def read_data_file(self):
+        """Read the data file as a dict, or None if it is missing or unreadable"""
+        if not os.path.exists(self.data_file):
+            return None
+        try:
+            with open(self.data_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading data: {e}", file=sys.stderr)
+            return None
+
+    def file_signature(self):
+        """Identify the current version of the data file on disk"""
+        try:
+            st = os.stat(self.data_file)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def take_snapshot(self):
+        """Remember the on-disk state as the base for merging external edits"""
+        self.base_resolutions = list(self.resolutions)
+        self.base_categories = dict(self.categories)
+        self.base_completions = {key: list(value) for key, value in self.completions.items()}
+        self.base_signature = self.file_signature()
+
+    def has_external_changes(self):
+        """Check whether someone else wrote the data file since we last read or wrote it"""
+        return self.file_signature() != self.base_signature
+
+    def merge_external_changes(self):
+        """Three-way merge the data file into memory
+
+        Days changed only on disk are taken from disk, days changed only here are
+        kept, and a day toggled on both sides converges to the same value. A
+        resolution list (with its categories) edited on both sides is a conflict: ours is kept and the
+        disk version is copied aside to `conflict_file` so nothing is silently lost. Completions are
+        matched by position while the three resolution lists agree, otherwise by resolution name.
+
+        Returns (changed_keys, resolutions_changed, conflict).
+        """
+        disk = self.read_data_file()
+        if disk is None:
+            return set(), False, False
+
+        disk_resolutions, disk_completions, disk_categories = validate_data(disk)
+        resolutions_changed = False
+        conflict = False
+
+        our_resolutions = self.resolutions
+        disk_list = (disk_resolutions, disk_categories)
+        base_list = (self.base_resolutions, self.base_categories)
+        our_list = (self.resolutions, self.categories)
+        if disk_list != base_list and disk_list != our_list:
+            if our_list == base_list:
+                self.resolutions = list(disk_resolutions)
+                self.categories = dict(disk_categories)
+                resolutions_changed = True
+            else:
+                conflict = True
+                self.save_conflict(disk)
+
+        # With the lists in different orders an index means a different resolution on each side
+        by_name = not (disk_resolutions == self.base_resolutions == our_resolutions == self.resolutions)
+        keys = set(disk_completions) | set(self.base_completions)
+        if by_name:
+            keys |= set(self.completions)
+
+        changed_keys = set()
+        for key in keys:
+            theirs = disk_completions.get(key, [])
+            base = self.base_completions.get(key, [])
+            ours = self.completions.get(key, [])
+            if by_name:
+                theirs = completions_by_name(disk_resolutions, theirs)
+                base = completions_by_name(self.base_resolutions, base)
+                ours_by_name = completions_by_name(our_resolutions, ours)
+                merged = []
+                for name in self.resolutions:
+                    t = theirs.get(name, False)
+                    o = ours_by_name.get(name, False)
+                    b = base.get(name, False)
+                    merged.append(o if o != b else t)
+            else:
+                if theirs == base:
+                    continue
+                merged = []
+                for i in range(max(len(theirs), len(ours), len(base))):
+                    t = bool(theirs[i]) if i < len(theirs) else False
+                    o = bool(ours[i]) if i < len(ours) else False
+                    b = bool(base[i]) if i < len(base) else False
+                    # Keep our value if we changed it, otherwise take theirs
+                    merged.append(o if o != b else t)
+
+            if merged != ours:
+                self.completions[key] = merged
+                changed_keys.add(key)
+
+        if changed_keys or resolutions_changed:
+            self.data_version += 1
+        self.base_resolutions = list(disk_resolutions)
+        self.base_categories = dict(disk_categories)
+        self.base_completions = {key: list(value) for key, value in disk_completions.items()}
+        self.base_signature = self.file_signature()
+        return changed_keys, resolutions_changed, conflict
+
+    def save_conflict(self, disk):
+        """Copy the disk side of a conflict to `conflict_file`, for edits of ours that replace it"""
+        conflict_file = self.data_file + '.conflict'
+        try:
+            write_json(conflict_file, disk)
+            self.conflict_file = conflict_file
+            print(f"Resolution edits conflict, disk version saved to {conflict_file}", file=sys.stderr)
+        except OSError as e:
+            print(f"Resolution edits conflict, could not save the disk version: {e}", file=sys.stderr)
+
+    def save_data(self):
+        """Save resolutions and completion data to file"""
+        if not self.data_loaded:
+            # Never write the startup placeholder over the real data
+            return
+        self.data_version += 1
+        try:
+            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+            with self.locked():
+                # Fold in edits made by other writers instead of overwriting them
+                if self.has_external_changes():
+                    self.merge_external_changes()
+                data = {
+                    'resolutions': self.resolutions,
+                    'completions': self.completions
+                }
+                # Only write categories for names still in the list
+                categories = {name: self.categories[name]
+                              for name in self.resolutions if self.categories.get(name)}
+                if categories:
+                    data['categories'] = categories
+                write_json(self.data_file, data)
+                self.take_snapshot()
+        except Exception as e:
+            print(f"Error saving data: {e}", file=sys.stderr)
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Hold an exclusive lock on the data file, e.g. across a load/modify/save"""
+        if self.lock_fd is not None:
+            # Already held by this instance
+            yield
+            return
+
+        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+        fd = os.open(self.data_file + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            self.lock_fd = fd
+            yield
+        finally:
+            self.lock_fd = None
+            os.close(fd)
+
+    def get_today_key(self):
+        """Get string key for today's date"""
+        return datetime.datetime.now().strftime('%Y-%m-%d')
+
+    def get_day_key(self, day_num):
+        """Get string key for a day of the current year"""
+        return self.get_day_date(day_num).strftime('%Y-%m-%d')
+
+    def get_day_date(self, day_num):
+        """Get the date of a day of the current year"""
+        start_of_year = datetime.datetime(self.year, 1, 1)
+        return start_of_year + datetime.timedelta(days=day_num - 1)
+
+    def get_completions_for_key(self, key):
+        """Get completion status for a date key, padded to the resolution count"""
+        if key not in self.completions:
+            self.completions[key] = [False] * len(self.resolutions)
+        # Ensure completions array matches current resolutions length
+        while len(self.completions[key]) < len(self.resolutions):
+            self.completions[key].append(False)
+        return self.completions[key]
+
+    def get_today_completions(self):
+        """Get completion status for today"""
+        return self.get_completions_for_key(self.get_today_key())
+
+    def get_day_completions(self, day_num):
+        """Get completion status for a specific day"""
+        return self.get_completions_for_key(self.get_day_key(day_num))
+
+    def find_resolution(self, name):
+        """Find a resolution index by name (case-insensitive) or 1-based number"""
+        for i, resolution in enumerate(self.resolutions):
+            if resolution.lower() == name.lower():
+                return i
+        if name.isdigit() and 1 <= int(name) <= len(self.resolutions):
+            return int(name) - 1
+        return None
+
+    def toggle_today(self, index):
+        """Toggle a resolution for today and save, return the new state"""
+        completions = self.get_today_completions()
+        completions[index] = not completions[index]
+        self.save_data()
+        return completions[index]
+
+    def get_category_masks(self):
+        """Get {category: bitmask of resolution indices}, rebuilt when the data changes"""
+        if self.masks_version != self.data_version:
+            masks = {}
+            for i, name in enumerate(self.resolutions):
+                category = self.categories.get(name)
+                if category:
+                    masks[category] = masks.get(category, 0) | (1 << i)
+            self.category_masks = masks
+            self.masks_version = self.data_version
+        return self.category_masks
+
+    def get_status(self):
+        """Get year progress and today's completions as a plain dict"""
+        completions = self.get_today_completions()
+        return {
+            'year': self.year,
+            'day': self.current_day,
+            'total_days': self.total_days,
+            'progress': round(self.progress, 1),
+            'resolutions': [
+                {'name': name, 'done': bool(completions[i]), 'category': self.categories.get(name)}
+                for i, name in enumerate(self.resolutions)
+            ],
+        }
+
+    def update_year_data(self):
+        """Calculate current year progress data"""
+        now = datetime.datetime.now()
+        self.year = now.year
+        self.is_leap = (self.year % 4 == 0 and self.year % 100 != 0) or (self.year % 400 == 0)
+        self.total_days = 366 if self.is_leap else 365
+
+        start_of_year = datetime.datetime(self.year, 1, 1)
+        self.current_day = (now - start_of_year).days + 1
+
+        self.progress = (self.current_day / self.total_days) * 100
@@ -0,0 +1,196 @@
+"""
+Year Progress resolution editor
+Line-list text buffer and cached per-line glyph advances for the settings view
+"""
+
+import bisect
+
+
+def is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class TextBuffer:
+    """Text stored as a list of lines with a (row, col) cursor
+
+    Edits touch only the current line, so typing costs O(line length)
+    instead of rebuilding the whole text on every keystroke.
+    """
+
+    def __init__(self, text=""):
+        self.set_text(text)
+
+    def set_text(self, text):
+        self.lines = text.split('\n')
+        self.row = len(self.lines) - 1
+        self.col = len(self.lines[-1])
+
+    def get_text(self):
+        return '\n'.join(self.lines)
+
+    def current_line(self):
+        return self.lines[self.row]
+
+    # Editing
+
+    def insert(self, text):
+        """Insert text at the cursor, splitting lines on newlines"""
+        line = self.lines[self.row]
+        head, tail = line[:self.col], line[self.col:]
+        parts = text.split('\n')
+        if len(parts) == 1:
+            self.lines[self.row] = head + text + tail
+            self.col += len(text)
+        else:
+            new_lines = [head + parts[0]] + parts[1:-1] + [parts[-1] + tail]
+            self.lines[self.row:self.row + 1] = new_lines
+            self.row += len(parts) - 1
+            self.col = len(parts[-1])
+
+    def newline(self):
+        self.insert('\n')
+
+    def backspace(self):
+        """Delete the character before the cursor"""
+        if self.col > 0:
+            line = self.lines[self.row]
+            self.lines[self.row] = line[:self.col - 1] + line[self.col:]
+            self.col -= 1
+        elif self.row > 0:
+            # Join with the previous line
+            self.col = len(self.lines[self.row - 1])
+            self.lines[self.row - 1] += self.lines.pop(self.row)
+            self.row -= 1
+        else:
+            return
+
+    def delete(self):
+        """Delete the character after the cursor"""
+        line = self.lines[self.row]
+        if self.col < len(line):
+            self.lines[self.row] = line[:self.col] + line[self.col + 1:]
+        elif self.row < len(self.lines) - 1:
+            self.lines[self.row] += self.lines.pop(self.row + 1)
+        else:
+            return
+
+    def delete_word_left(self):
+        """Delete from the start of the previous word to the cursor"""
+        end_row, end_col = self.row, self.col
+        self.move_word_left()
+        if (self.row, self.col) == (end_row, end_col):
+            return
+        if self.row == end_row:
+            line = self.lines[self.row]
+            self.lines[self.row] = line[:self.col] + line[end_col:]
+        else:
+            self.lines[self.row:end_row + 1] = [
+                self.lines[self.row][:self.col] + self.lines[end_row][end_col:]
+            ]
+
+    # Cursor movement
+
+    def move_left(self):
+        if self.col > 0:
+            self.col -= 1
+        elif self.row > 0:
+            self.row -= 1
+            self.col = len(self.lines[self.row])
+
+    def move_right(self):
+        if self.col < len(self.lines[self.row]):
+            self.col += 1
+        elif self.row < len(self.lines) - 1:
+            self.row += 1
+            self.col = 0
+
+    def move_up(self):
+        if self.row > 0:
+            self.row -= 1
+            self.col = min(self.col, len(self.lines[self.row]))
+
+    def move_down(self):
+        if self.row < len(self.lines) - 1:
+            self.row += 1
+            self.col = min(self.col, len(self.lines[self.row]))
+
+    def move_home(self):
+        self.col = 0
+
+    def move_end(self):
+        self.col = len(self.lines[self.row])
+
+    def move_word_left(self):
+        """Move to the start of the current or previous word"""
+        if self.col == 0:
+            self.move_left()
+            return
+        line = self.lines[self.row]
+        col = self.col
+        while col > 0 and not is_word_char(line[col - 1]):
+            col -= 1
+        while col > 0 and is_word_char(line[col - 1]):
+            col -= 1
+        self.col = col
+
+    def move_word_right(self):
+        """Move to the end of the current or next word"""
+        line = self.lines[self.row]
+        if self.col == len(line):
+            self.move_right()
+            return
+        col = self.col
+        while col < len(line) and not is_word_char(line[col]):
+            col += 1
+        while col < len(line) and is_word_char(line[col]):
+            col += 1
+        self.col = col
+
+    def move_to(self, row, col):
+        self.row = max(0, min(row, len(self.lines) - 1))
+        self.col = max(0, min(col, len(self.lines[self.row])))
+
+
+class LineLayoutCache:
+    """Cumulative glyph advances per line for a single font
+
+    advances(line)[i] is the x offset of the cursor before character i, so
+    cursor placement is an index and click-to-position is a bisect.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.cache = {}
+
+    def clear(self):
+        self.cache.clear()
+
+    def advances(self, scaled_font, line):
+        cached = self.cache.get(line)
+        if cached is not None:
+            return cached
+
+        glyphs = scaled_font.text_to_glyphs(0, 0, line, False) if line else []
+        end = scaled_font.text_extents(line).x_advance if line else 0.0
+        if len(glyphs) == len(line):
+            offsets = [glyph[1] for glyph in glyphs] + [end]
+        else:
+            # Glyphs do not map one-to-one to characters, measure prefixes
+            offsets = [0.0] + [scaled_font.text_extents(line[:i]).x_advance
+                               for i in range(1, len(line) + 1)]
+
+        if len(self.cache) >= self.max_entries:
+            self.cache.clear()
+        self.cache[line] = offsets
+        return offsets
+
+    def column_at(self, scaled_font, line, x):
+        """Get the character index nearest to x within a line"""
+        offsets = self.advances(scaled_font, line)
+        i = bisect.bisect_left(offsets, x)
+        if i == 0:
+            return 0
+        if i >= len(offsets):
+            return len(line)
+        # Pick the closer of the two surrounding boundaries
+        return i if offsets[i] - x < x - offsets[i - 1] else i - 1
@@ -0,0 +1,125 @@
+"""
+Year Progress polybar module
+Prints year progress and today's resolution hearts as a polybar tail line
+"""
+
+import ctypes
+import ctypes.util
+import datetime
+import os
+import select
+import struct
+import sys
+import time
+
+from year_progress_data import YearProgressData
+
+# Colours matching the desktop widget hearts
+DONE_COLOR = '#33cc33'
+TODO_COLOR = '#808080'
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+EVENT_HEADER = struct.Struct('iIII')
+
+POLL_INTERVAL = 5  # Seconds between stat checks when inotify is unavailable
+MAX_SLEEP = 300  # Re-check the date at least this often, e.g. after a suspend
+
+
+class DataFileWatcher:
+    """Wait for changes to a single file using inotify on its directory"""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.fsencode(os.path.basename(path))
+        self.fd = None
+        self.last_stat = self.stat()
+
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            return
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC)
+            if fd < 0:
+                return
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE
+            if libc.inotify_add_watch(fd, os.fsencode(os.path.dirname(path)), mask) < 0:
+                os.close(fd)
+                return
+            self.fd = fd
+        except (AttributeError, OSError):
+            self.fd = None
+
+    def stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def wait(self, timeout):
+        """Block for up to timeout seconds, return True if the file changed"""
+        if self.fd is None:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                time.sleep(min(POLL_INTERVAL, max(0, deadline - time.monotonic())))
+                current = self.stat()
+                if current != self.last_stat:
+                    self.last_stat = current
+                    return True
+            return False
+
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+
+        buf = os.read(self.fd, 4096)
+        changed = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buf):
+            _, _, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            name = buf[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length]
+            if name.rstrip(b'\0') == self.name:
+                changed = True
+            offset += EVENT_HEADER.size + length
+        return changed
+
+
+def format_line(data):
+    """Format year progress and today's hearts for polybar"""
+    completions = data.get_today_completions()
+    hearts = []
+    for i in range(len(data.resolutions)):
+        if i < len(completions) and completions[i]:
+            hearts.append(f"%{{F{DONE_COLOR}}}♥%{{F-}}")
+        else:
+            hearts.append(f"%{{F{TODO_COLOR}}}♡%{{F-}}")
+    return f"{data.progress:.1f}% " + ' '.join(hearts)
+
+
+def seconds_until_midnight():
+    now = datetime.datetime.now()
+    tomorrow = now.replace(hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+    return (tomorrow - now).total_seconds()
+
+
+def run(data_file=None):
+    """Print a line now, then again whenever the day or the data file changes"""
+    data = YearProgressData(data_file)
+    watcher = DataFileWatcher(data.data_file)
+    last_line = None
+
+    while True:
+        line = format_line(data)
+        if line != last_line:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+            last_line = line
+
+        # Wake one second after midnight at the latest
+        if watcher.wait(min(seconds_until_midnight() + 1, MAX_SLEEP)):
+            data.load_data()
+        data.update_year_data()
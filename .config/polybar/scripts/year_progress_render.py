@@ -0,0 +1,842 @@
+"""
+Year Progress renderer
+Cairo drawing for the year progress widget, usable without GTK for headless rendering
+"""
+
+import cairo
+import datetime
+import math
+import os
+import time
+
+from day_grid import DONE_1, DONE_4, DayGrid, day_bits, day_levels
+from year_progress_data import YearProgressData
+from scene_graph import Node, Scene, rounded_rectangle
+from text_cache import TextCache
+from year_progress_editor import LineLayoutCache, TextBuffer
+
+WIDTH = 320
+HEIGHT = 420
+
+# Day grid layout
+DAY_RADIUS = 2.5
+DAY_SPACING = 9
+GRID_X = 22
+GRID_Y = 110
+GRID_COLS = 26
+GRID_ROWS = 15  # Enough rows for 366 days
+
+# Decade view layout, one block of rows per year
+DECADE_YEARS = 10
+DECADE_X = 56
+DECADE_Y = 76
+DECADE_COLS = 61
+DECADE_ROWS = 6
+DECADE_SPACING = 4
+DECADE_RADIUS = 1.5
+DECADE_YEAR_GAP = 6
+
+PANEL_COLOR = (0.1, 0.1, 0.1, 0.7)
+PANEL_RECT = (10, 10, 300, 400)
+HEART_Y = 348  # Centre line of the main view hearts
+
+# Node bounds, padded for the hover rings
+LABELS_RECT = (10, 10, 178, 82)  # Title, percentage and day counter of the main view
+GRID_RECT = (GRID_X - DAY_SPACING, GRID_Y - DAY_SPACING,
+             (GRID_COLS + 1) * DAY_SPACING, (GRID_ROWS + 1) * DAY_SPACING)
+DECADE_RECT = (10, DECADE_Y - DECADE_SPACING, 300,
+               DECADE_YEARS * (DECADE_ROWS * DECADE_SPACING + DECADE_YEAR_GAP))
+PROGRESS_RECT = (19, 374, 282, 24)
+
+# Resolution editor layout
+TEXT_BOX = (20, 80, 280, 280)
+LINE_HEIGHT = 18
+VISIBLE_LINES = 15
+
+# Fonts as (family, slant, weight, size) for the text cache
+FONT_TITLE = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 20)
+FONT_DATE_TITLE = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 18)
+FONT_SUBTITLE = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 16)
+FONT_HEADING = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 14)
+FONT_BUTTON = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 12)
+FONT_CHECK = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD, 16)
+FONT_ITEM = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL, 13)
+FONT_INSTRUCTIONS = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL, 12)
+FONT_TOOLTIP = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL, 11)
+FONT_LABEL = ("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL, 9)
+FONT_EMPTY_NOTE = ("Sans", cairo.FONT_SLANT_ITALIC, cairo.FONT_WEIGHT_NORMAL, 13)
+FONT_TIP = ("Sans", cairo.FONT_SLANT_ITALIC, cairo.FONT_WEIGHT_NORMAL, 10)
+FONT_EDITOR = ("Fira Code", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL, 13)
+FONT_HEART = ("Fira Code", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL, 16)
+
+
+class YearProgressRenderer(YearProgressData):
+    def __init__(self, data_file=None, load=True):
+        # Day dot grids, laid out for the current year by update_year_data()
+        self.year_grid = DayGrid(GRID_X, GRID_Y, GRID_COLS, GRID_ROWS,
+                                 DAY_SPACING, DAY_RADIUS, PANEL_COLOR)
+        self.decade_grid = DayGrid(DECADE_X, DECADE_Y, DECADE_COLS, DECADE_ROWS,
+                                   DECADE_SPACING, DECADE_RADIUS, PANEL_COLOR, DECADE_YEAR_GAP)
+        super().__init__(data_file, load)
+
+        # View state
+        self.view_mode = 'main'  # 'main', 'settings', 'day_view', 'decade'
+        self.editor = TextBuffer()
+        self.editor_layout = LineLayoutCache()
+        self.editor_base = ""  # Editor text as last loaded, to tell whether it was edited
+        self.editor_stale = False  # Whether the list changed on disk under edits in the editor
+        self.editor_font = None  # Scaled font of the last drawn editor text
+        self.scroll_top = 0  # First visible editor line
+        self.cursor_visible = True
+        self.viewing_day = None  # Which day we're viewing
+        self.category_filter = None  # Category shown in the grids and hearts, None for all
+
+        # Node tree of each view, hover state lives in the scene
+        self.scene = Scene()
+        self.views = self.build_views()
+
+        # Scaled fonts and shaped text, rebuilt on font or DPI change
+        self.text = TextCache()
+
+    def build_views(self):
+        """Build the node tree of every view, later nodes are drawn and hit on top"""
+        def has_filter():
+            return bool(self.get_category_masks())
+
+        return {
+            'main': Node('panel', PANEL_RECT, self.draw_panel, [
+                Node('labels', LABELS_RECT, self.draw_day_labels, cache=True,
+                     background=PANEL_COLOR, key=lambda: (self.year, self.current_day)),
+                Node('days', GRID_RECT, self.draw_day_circles,
+                     hit=self.day_at, hover_rect=self.get_hover_rect),
+                Node('hearts', self.get_hearts_rect(), self.draw_resolution_hearts, hit=self.heart_at),
+                Node('settings_button', self.get_settings_button_rect(), self.draw_settings_button,
+                     hit=True),
+                Node('decade_button', self.get_decade_button_rect(), self.draw_decade_button,
+                     hit=True),
+                Node('filter_button', self.get_filter_button_rect(), self.draw_filter_button,
+                     hit=True, visible=has_filter),
+                Node('progress_bar', PROGRESS_RECT, self.draw_progress_bar, cache=True,
+                     background=PANEL_COLOR, key=lambda: self.progress),
+                Node('conflict_note', self.get_conflict_note_rect(), self.draw_conflict_note,
+                     hit=True, visible=lambda: self.conflict_file is not None),
+                Node('tooltip', PANEL_RECT, self.draw_day_tooltip,
+                     visible=lambda: self.hover_day is not None),
+            ]),
+            'settings': Node('panel', PANEL_RECT, self.draw_settings_panel, [
+                Node('text_box', TEXT_BOX, self.draw_editor, hit=True),
+                Node('close_button', self.get_close_button_rect(), self.draw_close_button, hit=True),
+            ]),
+            'day_view': Node('panel', PANEL_RECT, self.draw_day_panel, [
+                Node('day_list', self.get_day_view_list_rect(), self.draw_day_list, cache=True,
+                     background=PANEL_COLOR,
+                     key=lambda: (self.viewing_day, self.data_version, self.get_filter())),
+                Node('back_button', self.get_back_button_rect(), self.draw_back_button, hit=True),
+            ]),
+            'decade': Node('panel', PANEL_RECT, self.draw_decade_panel, [
+                Node('decade_days', DECADE_RECT, self.draw_decade_days,
+                     hit=self.decade_day_at, hover_rect=self.get_hover_rect),
+                Node('back_button', self.get_back_button_rect(), self.draw_back_button, hit=True),
+                Node('filter_button', self.get_filter_button_rect(), self.draw_filter_button,
+                     hit=True, visible=has_filter),
+                Node('tooltip', PANEL_RECT, self.draw_day_tooltip,
+                     visible=lambda: self.hover_day is not None),
+            ]),
+        }
+
+    @property
+    def hover_day(self):
+        """Get the day under the pointer in the main or decade view"""
+        name, detail = self.scene.hover
+        return detail if name in ('days', 'decade_days') else None
+
+    def update_scene(self):
+        """Point the scene at the nodes of the current view"""
+        self.scene.set_root(self.views[self.view_mode])
+
+    def update_year_data(self):
+        super().update_year_data()
+        self.year_grid.set_years(self.year, 1)
+
+    def get_today_ordinal(self):
+        return datetime.date(self.year, 1, 1).toordinal() + self.current_day - 1
+
+    def get_filter(self):
+        """Get the active category, or None if showing everything"""
+        if self.category_filter in self.get_category_masks():
+            return self.category_filter
+        return None
+
+    def get_filter_mask(self):
+        """Get the bitmask of the resolutions passing the category filter"""
+        category = self.get_filter()
+        if category is None:
+            return (1 << len(self.resolutions)) - 1
+        return self.get_category_masks()[category]
+
+    def get_visible_resolutions(self):
+        """Get the indices of the resolutions passing the category filter"""
+        mask = self.get_filter_mask()
+        return [i for i in range(len(self.resolutions)) if mask >> i & 1]
+
+    def cycle_category_filter(self):
+        """Switch to the next category, then back to all"""
+        categories = list(self.get_category_masks())
+        current = self.get_filter()
+        if current is None:
+            self.category_filter = categories[0] if categories else None
+        else:
+            i = categories.index(current) + 1
+            self.category_filter = categories[i] if i < len(categories) else None
+
+    def refresh_grid(self, grid, first_year, count, shade):
+        """Recompute a grid's dot levels if the date, the data or the filter changed
+
+        Completion bitmasks are only rebuilt when the data changes, switching
+        the category filter just recolours from them.
+        """
+        grid.set_years(first_year, count)
+        today = self.get_today_ordinal()
+        if shade and grid.bits_key != (grid.years, self.data_version):
+            grid.bits = day_bits(grid.first_ordinal, grid.total, self.completions)
+            grid.bits_key = (grid.years, self.data_version)
+
+        mask = self.get_filter_mask() if shade else None
+        key = (grid.years, today, grid.bits_key if shade else None, mask)
+        if key != grid.levels_key:
+            grid.levels_key = key
+            grid.set_levels(day_levels(grid.first_ordinal, grid.total, today,
+                                       grid.bits if shade else None, mask))
+
+    def get_day_center(self, day):
+        """Get the centre of a day circle"""
+        return self.year_grid.center(day - 1)
+
+    def day_at(self, x, y):
+        """Get the day whose circle is under a point, in constant time"""
+        index = self.year_grid.index_at(x, y)
+        return None if index is None else index + 1
+
+    def decade_day_at(self, x, y):
+        """Get the day, counted from the first decade year, whose dot is under a point"""
+        index = self.decade_grid.index_at(x, y)
+        return None if index is None else index + 1
+
+    def get_hover_point(self, day):
+        """Get (x, y, date) of a hovered day in the current view"""
+        if self.view_mode == 'decade':
+            x, y = self.decade_grid.center(day - 1)
+            return x, y, self.decade_grid.date_of(day - 1)
+        x, y = self.get_day_center(day)
+        return x, y, self.get_day_date(day)
+
+    def get_hover_rect(self, day):
+        """Get the strip a hovered day's ring and tooltip can cover"""
+        _, y, _ = self.get_hover_point(day)
+        return (10, int(y) - 34, 300, 76)
+
+    def heart_at(self, x, y):
+        """Get the resolution index of the heart under a point"""
+        if abs(y - HEART_Y) > 10:
+            return None
+        for i, (hx, hy) in zip(self.get_visible_resolutions(), self.get_heart_positions()):
+            if abs(x - hx) <= 10 and abs(y - hy) <= 10:
+                return i
+        return None
+
+    def hit_test(self, x, y):
+        """Get (node name, detail) of what is under a point in the current view
+
+        The detail is the day for the day grids and the resolution index for
+        the hearts, None for buttons.
+        """
+        self.update_scene()
+        node, detail = self.scene.hit(x, y)
+        return (node.name if node else None), detail
+
+    def get_heart_positions(self):
+        """Calculate positions for the hearts of the visible resolutions"""
+        positions = []
+        heart_y = HEART_Y
+        num_hearts = len(self.get_visible_resolutions())
+
+        if num_hearts == 0:
+            return positions
+
+        # Calculate spacing to fit hearts nicely
+        total_width = 260
+        spacing = total_width / (num_hearts + 1)
+        start_x = 30
+
+        for i in range(num_hearts):
+            x = start_x + spacing * (i + 1)
+            positions.append((x, heart_y))
+
+        return positions
+
+    def get_settings_button_rect(self):
+        """Get rectangle for settings button"""
+        return (285, 343, 20, 20)
+
+    def get_close_button_rect(self):
+        """Get rectangle for close button in settings mode"""
+        return (20, 380, 60, 25)
+
+    def get_back_button_rect(self):
+        """Get rectangle for back button in day view"""
+        return (20, 380, 60, 25)
+
+    def get_decade_button_rect(self):
+        """Get rectangle for the decade view button in the main view"""
+        return (262, 24, 38, 20)
+
+    def get_filter_button_rect(self):
+        """Get rectangle for the category filter button"""
+        return (190, 24, 68, 20)
+
+    def get_conflict_note_rect(self):
+        """Get rectangle for the note about a conflicting external edit"""
+        return (190, 52, 110, 40)
+
+    def get_hearts_rect(self):
+        """Get the area covered by the hearts row and its labels"""
+        return (10, 334, 300, 36)
+
+    def get_day_view_list_rect(self):
+        """Get the area covered by the completed resolutions list in day view"""
+        return (10, 100, 300, 270)
+
+    def get_text_box_rect(self):
+        """Get rectangle for the resolution editor text box"""
+        return TEXT_BOX
+
+    def get_line_baseline(self, row):
+        """Get the baseline y of an editor line, relative to the scroll position"""
+        return TEXT_BOX[1] + 25 + (row - self.scroll_top) * LINE_HEIGHT
+
+    def get_cursor_x(self, row, col):
+        """Get the x position of the editor cursor from the cached line layout"""
+        if self.editor_font is None:
+            return TEXT_BOX[0] + 10
+        offsets = self.editor_layout.advances(self.editor_font, self.editor.lines[row])
+        return TEXT_BOX[0] + 10 + offsets[col]
+
+    def get_cursor_rect(self):
+        """Get the area covered by the editor cursor"""
+        x = self.get_cursor_x(self.editor.row, self.editor.col)
+        y = self.get_line_baseline(self.editor.row)
+        return (int(x) - 2, y - 13, 5, 17)
+
+    def scroll_to_cursor(self):
+        """Scroll the editor so the cursor line is visible"""
+        if self.editor.row < self.scroll_top:
+            self.scroll_top = self.editor.row
+        elif self.editor.row >= self.scroll_top + VISIBLE_LINES:
+            self.scroll_top = self.editor.row - VISIBLE_LINES + 1
+
+    def scroll_by(self, lines):
+        """Scroll the editor by a number of lines"""
+        max_top = max(0, len(self.editor.lines) - VISIBLE_LINES)
+        self.scroll_top = max(0, min(self.scroll_top + lines, max_top))
+
+    def editor_position_at(self, x, y):
+        """Get the (row, col) of the editor text under a point"""
+        row = self.scroll_top + int((y - (TEXT_BOX[1] + 25 - 13)) // LINE_HEIGHT)
+        row = max(0, min(row, len(self.editor.lines) - 1))
+        line = self.editor.lines[row]
+        if self.editor_font is None:
+            return row, len(line)
+        return row, self.editor_layout.column_at(self.editor_font, line, x - TEXT_BOX[0] - 10)
+
+    def get_day_view_heart_positions(self):
+        """Calculate positions for resolution hearts in day view"""
+        positions = []
+        start_y = 120
+        spacing = 40
+
+        for i in range(len(self.resolutions)):
+            y = start_y + i * spacing
+            positions.append((40, y))
+
+        return positions
+
+    def get_day_labels(self):
+        """Get the (font, text) runs of the main view that change with the date"""
+        return [
+            (FONT_TITLE, f"Year {self.year}"),
+            (FONT_SUBTITLE, f"{self.progress:.1f}% Complete"),
+            (FONT_HEADING, f"Day {self.current_day} of {self.total_days}"),
+            (FONT_BUTTON, f"{self.progress:.1f}%"),
+        ]
+
+    def on_new_day(self, old_date, new_date):
+        """Move to a new date, dropping only the state that depends on it"""
+        stale_labels = self.get_day_labels()
+        self.update_year_data()
+        for spec, text in stale_labels:
+            self.text.discard(spec, text)
+
+        if new_date.year != old_date.year:
+            # Day numbers now refer to a different year
+            self.scene.set_hover(None)
+            if self.view_mode == 'day_view':
+                self.view_mode = 'main'
+                self.viewing_day = None
+
+    def draw(self, cr):
+        """Draw the nodes of the current view that intersect the clip"""
+        # Make background transparent
+        cr.set_source_rgba(0, 0, 0, 0)
+        cr.set_operator(cairo.OPERATOR_SOURCE)
+        cr.paint()
+
+        self.text.check_context(cr)
+        self.update_scene()
+        self.scene.draw(cr)
+
+    def draw_panel(self, cr):
+        """Draw the semi-transparent background panel"""
+        cr.set_source_rgba(*PANEL_COLOR)
+        cr.rectangle(*PANEL_RECT)
+        cr.fill()
+
+    def draw_day_labels(self, cr):
+        """Draw the title, percentage and day counter of the main view"""
+        # Draw title
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        self.text.show(cr, FONT_TITLE, f"Year {self.year}", 20, 40)
+
+        # Draw progress percentage
+        self.text.show(cr, FONT_SUBTITLE, f"{self.progress:.1f}% Complete", 20, 65)
+
+        # Draw day counter
+        cr.set_source_rgba(1, 1, 1, 0.7)
+        self.text.show(cr, FONT_HEADING, f"Day {self.current_day} of {self.total_days}", 20, 85)
+
+    def draw_settings_panel(self, cr):
+        """Draw the panel, title, instructions and tip of the resolution editor"""
+        self.draw_panel(cr)
+
+        # Draw title
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        self.text.show(cr, FONT_TITLE, "Edit Resolutions", 20, 40)
+
+        # Draw instructions
+        cr.set_source_rgba(1, 1, 1, 0.7)
+        self.text.show(cr, FONT_INSTRUCTIONS, "One resolution per line, #category optional:", 20, 65)
+
+        # Draw tip
+        text_box_x, text_box_y, _, text_box_h = self.get_text_box_rect()
+        cr.set_source_rgba(1, 1, 1, 0.5)
+        self.text.show(cr, FONT_TIP, "💡 Tip: Keep it simple - 3-5 resolutions work best!",
+                       text_box_x, text_box_y + text_box_h + 15)
+
+    def draw_editor(self, cr):
+        """Draw the resolution editor text box"""
+        text_box_x, text_box_y, text_box_w, text_box_h = self.get_text_box_rect()
+
+        cr.set_source_rgba(0.15, 0.15, 0.15, 0.8)
+        rounded_rectangle(cr, text_box_x, text_box_y, text_box_w, text_box_h, 5)
+        cr.fill()
+
+        # Draw border
+        cr.set_source_rgba(1, 1, 1, 0.3)
+        cr.set_line_width(1)
+        rounded_rectangle(cr, text_box_x, text_box_y, text_box_w, text_box_h, 5)
+        cr.stroke()
+
+        # Draw the visible lines
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        font = self.text.font(cr, FONT_EDITOR)
+        if font is not self.editor_font:
+            # Cached advances belong to the old font
+            self.editor_layout.clear()
+            self.editor_font = font
+
+        lines = self.editor.lines
+        visible = range(self.scroll_top, min(len(lines), self.scroll_top + VISIBLE_LINES))
+        for row in visible:
+            self.text.show(cr, FONT_EDITOR, lines[row], text_box_x + 10, self.get_line_baseline(row))
+
+        # Draw scrollbar when the text does not fit
+        if len(lines) > VISIBLE_LINES:
+            track_h = text_box_h - 10
+            thumb_h = max(12, track_h * VISIBLE_LINES / len(lines))
+            thumb_y = text_box_y + 5 + (track_h - thumb_h) * self.scroll_top / (len(lines) - VISIBLE_LINES)
+            cr.set_source_rgba(1, 1, 1, 0.3)
+            rounded_rectangle(cr, text_box_x + text_box_w - 7, thumb_y, 3, thumb_h, 1.5)
+            cr.fill()
+
+        # Draw blinking cursor
+        if self.cursor_visible and self.editor.row in visible:
+            cursor_x = self.get_cursor_x(self.editor.row, self.editor.col)
+            cursor_y = self.get_line_baseline(self.editor.row)
+            cr.set_source_rgba(0.2, 0.8, 0.2, 1.0)
+            cr.set_line_width(2)
+            cr.move_to(cursor_x, cursor_y - 12)
+            cr.line_to(cursor_x, cursor_y + 2)
+            cr.stroke()
+
+    def draw_close_button(self, cr):
+        """Draw close/back button in settings view"""
+        btn_x, btn_y, btn_w, btn_h = self.get_close_button_rect()
+
+        # Button background
+        if self.scene.hovered('close_button'):
+            cr.set_source_rgba(0.2, 0.8, 0.2, 0.8)
+        else:
+            cr.set_source_rgba(0.2, 0.6, 0.2, 0.6)
+
+        rounded_rectangle(cr, btn_x, btn_y, btn_w, btn_h, 3)
+        cr.fill()
+
+        # Button text
+        cr.set_source_rgba(1, 1, 1, 1)
+        text = "Close"
+        extents = self.text.extents(cr, FONT_BUTTON, text)
+        self.text.show(cr, FONT_BUTTON, text,
+                       btn_x + (btn_w - extents.width) / 2, btn_y + (btn_h + extents.height) / 2 - 1)
+
+    def draw_day_panel(self, cr):
+        """Draw the panel and headings of the day view"""
+        self.draw_panel(cr)
+
+        # Get date info
+        date = self.get_day_date(self.viewing_day)
+        date_str = date.strftime("%B %d, %Y")
+
+        # Draw title
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        self.text.show(cr, FONT_DATE_TITLE, date_str, 20, 40)
+
+        # Draw day number
+        cr.set_source_rgba(1, 1, 1, 0.7)
+        self.text.show(cr, FONT_HEADING, f"Day {self.viewing_day} of {self.total_days}", 20, 65)
+
+        # Draw section title
+        cr.set_source_rgba(1, 1, 1, 0.8)
+        self.text.show(cr, FONT_HEADING, "Completed Resolutions:", 20, 95)
+
+    def draw_day_list(self, cr):
+        """Draw the resolutions completed on the viewed day"""
+        # Get completions for this day
+        completions = self.get_day_completions(self.viewing_day)
+
+        # Filter to show only completed resolutions in the category
+        mask = self.get_filter_mask()
+        completed_items = []
+        for i, completed in enumerate(completions):
+            if completed and i < len(self.resolutions) and mask >> i & 1:
+                completed_items.append(self.resolutions[i])
+
+        # Draw completed resolutions
+        if len(completed_items) == 0:
+            cr.set_source_rgba(1, 1, 1, 0.5)
+            self.text.show(cr, FONT_EMPTY_NOTE, "No resolutions completed on this day", 20, 125)
+        else:
+            start_y = 120
+            spacing = 30
+
+            for i, resolution in enumerate(completed_items):
+                y = start_y + i * spacing
+
+                # Draw checkmark
+                cr.set_source_rgba(0.2, 0.8, 0.2, 1.0)
+                self.text.show(cr, FONT_CHECK, "✓", 20, y)
+
+                # Draw resolution name
+                cr.set_source_rgba(1, 1, 1, 0.9)
+                self.text.show(cr, FONT_ITEM, resolution, 40, y)
+
+    def draw_decade_panel(self, cr):
+        """Draw the panel, title and totals of the decade view"""
+        self.draw_panel(cr)
+
+        grid = self.decade_grid
+        first_year = self.year - DECADE_YEARS + 1
+        self.refresh_grid(grid, first_year, DECADE_YEARS, shade=True)
+
+        # Draw title and totals
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        self.text.show(cr, FONT_TITLE, f"{first_year} – {self.year}", 20, 40)
+        active = grid.count(DONE_1, DONE_4)
+        perfect = grid.count(DONE_4)
+        cr.set_source_rgba(1, 1, 1, 0.7)
+        self.text.show(cr, FONT_INSTRUCTIONS,
+                       f"{active} active days, {perfect} with everything done", 20, 60)
+
+    def draw_decade_days(self, cr):
+        """Draw the last DECADE_YEARS years of days, shaded by completion"""
+        grid = self.decade_grid
+        first_year = self.year - DECADE_YEARS + 1
+        self.refresh_grid(grid, first_year, DECADE_YEARS, shade=True)
+
+        # Draw year labels
+        cr.set_source_rgba(1, 1, 1, 0.6)
+        for block in range(DECADE_YEARS):
+            self.text.show(cr, FONT_LABEL, str(first_year + block),
+                           20, grid.block_top(block) + DECADE_ROWS * DECADE_SPACING / 2)
+
+        grid.draw(cr)
+
+        # Highlight hovered day
+        if self.hover_day:
+            x, y = grid.center(self.hover_day - 1)
+            cr.set_source_rgba(1, 1, 1, 0.6)
+            cr.set_line_width(1)
+            cr.arc(x, y, DECADE_RADIUS + 1.5, 0, 2 * math.pi)
+            cr.stroke()
+
+    def draw_back_button(self, cr):
+        """Draw back button in day view"""
+        btn_x, btn_y, btn_w, btn_h = self.get_back_button_rect()
+
+        # Button background
+        if self.scene.hovered('back_button'):
+            cr.set_source_rgba(0.2, 0.8, 0.2, 0.8)
+        else:
+            cr.set_source_rgba(0.2, 0.6, 0.2, 0.6)
+
+        rounded_rectangle(cr, btn_x, btn_y, btn_w, btn_h, 3)
+        cr.fill()
+
+        # Button text
+        cr.set_source_rgba(1, 1, 1, 1)
+        text = "Back"
+        extents = self.text.extents(cr, FONT_BUTTON, text)
+        self.text.show(cr, FONT_BUTTON, text,
+                       btn_x + (btn_w - extents.width) / 2, btn_y + (btn_h + extents.height) / 2 - 1)
+
+    def draw_day_circles(self, cr):
+        """Draw 365/366 circles representing each day"""
+        # Shade by completion when looking at one category
+        self.refresh_grid(self.year_grid, self.year, 1, shade=self.get_filter() is not None)
+        self.year_grid.draw(cr)
+
+        # Highlight hovered day
+        if self.hover_day:
+            x, y = self.get_day_center(self.hover_day)
+            cr.set_source_rgba(1, 1, 1, 0.3)
+            cr.arc(x, y, DAY_RADIUS + 2, 0, 2 * math.pi)
+            cr.stroke()
+
+    def draw_resolution_hearts(self, cr):
+        """Draw hearts for daily resolutions using FiraCode font"""
+        completions = self.get_today_completions()
+        positions = self.get_heart_positions()
+        hover_heart = self.scene.hover_detail('hearts')
+
+        for i, (x, y) in zip(self.get_visible_resolutions(), positions):
+            completed = completions[i] if i < len(completions) else False
+
+            # Draw heart using unicode character
+            if completed:
+                # Filled heart
+                heart = "♥"
+                cr.set_source_rgba(0.2, 0.8, 0.2, 1.0)
+            else:
+                # Empty heart
+                heart = "♡"
+                cr.set_source_rgba(0.5, 0.5, 0.5, 0.8)
+
+            extents = self.text.extents(cr, FONT_HEART, heart)
+            self.text.show(cr, FONT_HEART, heart, x - extents.width/2, y + extents.height/2)
+
+            # Highlight on hover
+            if hover_heart == i:
+                cr.set_source_rgba(1, 1, 1, 0.2)
+                cr.arc(x, y, 12, 0, 2 * math.pi)
+                cr.fill()
+
+            # Draw resolution label below heart
+            cr.set_source_rgba(1, 1, 1, 0.7)
+            label = self.resolutions[i] if i < len(self.resolutions) else ""
+            if len(label) > 12:
+                label = label[:10] + "..."
+            extents = self.text.extents(cr, FONT_LABEL, label)
+            self.text.show(cr, FONT_LABEL, label, x - extents.width/2, y + 16)
+
+    def draw_filter_button(self, cr):
+        """Draw the button cycling the category filter"""
+        btn_x, btn_y, btn_w, btn_h = self.get_filter_button_rect()
+
+        if self.scene.hovered('filter_button'):
+            cr.set_source_rgba(0.3, 0.3, 0.3, 0.8)
+        else:
+            cr.set_source_rgba(0.2, 0.2, 0.2, 0.6)
+        rounded_rectangle(cr, btn_x, btn_y, btn_w, btn_h, 3)
+        cr.fill()
+
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        text = self.get_filter() or "All"
+        if len(text) > 9:
+            text = text[:8] + "…"
+        extents = self.text.extents(cr, FONT_BUTTON, text)
+        self.text.show(cr, FONT_BUTTON, text,
+                       btn_x + (btn_w - extents.width) / 2, btn_y + (btn_h + extents.height) / 2 - 1)
+
+    def draw_decade_button(self, cr):
+        """Draw the button opening the decade view"""
+        btn_x, btn_y, btn_w, btn_h = self.get_decade_button_rect()
+
+        if self.scene.hovered('decade_button'):
+            cr.set_source_rgba(0.3, 0.3, 0.3, 0.8)
+        else:
+            cr.set_source_rgba(0.2, 0.2, 0.2, 0.6)
+        rounded_rectangle(cr, btn_x, btn_y, btn_w, btn_h, 3)
+        cr.fill()
+
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        text = f"{DECADE_YEARS}y"
+        extents = self.text.extents(cr, FONT_BUTTON, text)
+        self.text.show(cr, FONT_BUTTON, text,
+                       btn_x + (btn_w - extents.width) / 2, btn_y + (btn_h + extents.height) / 2 - 1)
+
+    def draw_settings_button(self, cr):
+        """Draw + button for settings"""
+        btn_x, btn_y, btn_w, btn_h = self.get_settings_button_rect()
+
+        # Button background
+        if self.scene.hovered('settings_button'):
+            cr.set_source_rgba(0.3, 0.3, 0.3, 0.8)
+        else:
+            cr.set_source_rgba(0.2, 0.2, 0.2, 0.6)
+
+        cr.arc(btn_x + btn_w/2, btn_y + btn_h/2, btn_w/2, 0, 2 * math.pi)
+        cr.fill()
+
+        # + symbol
+        cr.set_source_rgba(1, 1, 1, 0.9)
+        cr.set_line_width(2)
+        center_x = btn_x + btn_w/2
+        center_y = btn_y + btn_h/2
+
+        # Horizontal line
+        cr.move_to(center_x - 6, center_y)
+        cr.line_to(center_x + 6, center_y)
+        cr.stroke()
+
+        # Vertical line
+        cr.move_to(center_x, center_y - 6)
+        cr.line_to(center_x, center_y + 6)
+        cr.stroke()
+
+    def draw_conflict_note(self, cr):
+        """Draw the note that the disk version of the resolutions was copied aside"""
+        x, y, w, h = self.get_conflict_note_rect()
+        if self.scene.hovered('conflict_note'):
+            cr.set_source_rgba(0.8, 0.5, 0.1, 0.9)
+        else:
+            cr.set_source_rgba(0.7, 0.4, 0.1, 0.8)
+        rounded_rectangle(cr, x, y, w, h, 3)
+        cr.fill()
+
+        cr.set_source_rgba(1, 1, 1, 1)
+        self.text.show(cr, FONT_BUTTON, "⚠ Edit conflict", x + 6, y + 17)
+        cr.set_source_rgba(1, 1, 1, 0.8)
+        self.text.show(cr, FONT_TIP, "Theirs in .conflict", x + 6, y + 32)
+
+    def draw_progress_bar(self, cr):
+        """Draw progress bar at the bottom"""
+        bar_x = 20
+        bar_y = 375
+        bar_width = 280
+        bar_height = 22
+
+        # Background
+        cr.set_source_rgba(0.2, 0.2, 0.2, 0.6)
+        cr.rectangle(bar_x, bar_y, bar_width, bar_height)
+        cr.fill()
+
+        # Filled portion
+        filled_width = bar_width * (self.progress / 100)
+        cr.set_source_rgba(0.2, 0.8, 0.2, 0.8)
+        cr.rectangle(bar_x, bar_y, filled_width, bar_height)
+        cr.fill()
+
+        # Border
+        cr.set_source_rgba(1, 1, 1, 0.3)
+        cr.set_line_width(1)
+        cr.rectangle(bar_x, bar_y, bar_width, bar_height)
+        cr.stroke()
+
+        # Percentage text
+        cr.set_source_rgba(1, 1, 1, 1)
+        text = f"{self.progress:.1f}%"
+        extents = self.text.extents(cr, FONT_BUTTON, text)
+        text_x = bar_x + (bar_width - extents.width) / 2
+        text_y = bar_y + (bar_height + extents.height) / 2
+        self.text.show(cr, FONT_BUTTON, text, text_x, text_y)
+
+    def draw_day_tooltip(self, cr):
+        """Draw tooltip showing date for hovered day"""
+        if not self.hover_day:
+            return
+
+        # Get circle position and date
+        x, y, date = self.get_hover_point(self.hover_day)
+        date_str = date.strftime("%B %d, %Y")
+
+        # Tooltip dimensions
+        extents = self.text.extents(cr, FONT_TOOLTIP, date_str)
+
+        tooltip_width = extents.width + 16
+        tooltip_height = 24
+        tooltip_x = x - tooltip_width / 2
+        tooltip_y = y - tooltip_height - 8
+
+        # Keep tooltip within bounds
+        if tooltip_x < 15:
+            tooltip_x = 15
+        if tooltip_x + tooltip_width > 295:
+            tooltip_x = 295 - tooltip_width
+        if tooltip_y < 15:
+            tooltip_y = y + 15
+
+        # Draw tooltip background
+        cr.set_source_rgba(0.15, 0.15, 0.15, 0.95)
+        rounded_rectangle(cr, tooltip_x, tooltip_y, tooltip_width, tooltip_height, 4)
+        cr.fill()
+
+        # Draw tooltip border
+        cr.set_source_rgba(1, 1, 1, 0.3)
+        cr.set_line_width(1)
+        rounded_rectangle(cr, tooltip_x, tooltip_y, tooltip_width, tooltip_height, 4)
+        cr.stroke()
+
+        # Draw text
+        cr.set_source_rgba(1, 1, 1, 1)
+        self.text.show(cr, FONT_TOOLTIP, date_str, tooltip_x + 8, tooltip_y + 16)
+
+
+def render_to_file(path, data_file=None, scale=1.0, view_mode='main', repeat=1):
+    """Render the widget to a PNG or SVG file without a window
+
+    With repeat > 1 the view is drawn that many times onto the same surface.
+    Returns the draw time of each frame in ms, the first one with cold caches.
+    """
+    renderer = YearProgressRenderer(data_file)
+    renderer.view_mode = view_mode
+    if view_mode == 'day_view':
+        renderer.viewing_day = renderer.current_day
+
+    width = int(WIDTH * scale)
+    height = int(HEIGHT * scale)
+
+    if os.path.splitext(path)[1].lower() == '.svg':
+        surface = cairo.SVGSurface(path, width, height)
+    else:
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+
+    cr = cairo.Context(surface)
+    cr.scale(scale, scale)
+    frame_times = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        renderer.draw(cr)
+        frame_times.append((time.perf_counter() - start) * 1000)
+
+    if isinstance(surface, cairo.ImageSurface):
+        surface.write_to_png(path)
+    surface.finish()
+    return frame_times
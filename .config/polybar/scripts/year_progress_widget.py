@@ -0,0 +1,592 @@
+"""
+Year Progress Widget for i3wm with Daily Resolutions
+A transparent desktop widget showing progress through the year with resolution tracking
+"""
+
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GLib, Gio
+import cairo
+import datetime
+import threading
+import time
+
+from day_scheduler import LOCALTIME, DayScheduler, WallClockAlarm, next_midnight
+from frame_stats import (FrameStats, SUMMARY_INTERVAL, OVERLAY_HEIGHT,
+                         damage_area, draw_overlay, instrumentation_enabled)
+from year_progress_control import create_server_socket, serve_request
+from year_progress_data import format_resolution_line, parse_resolution_line
+from year_progress_render import YearProgressRenderer, GRID_RECT, WIDTH, HEIGHT
+
+
+class YearProgressWidget(YearProgressRenderer, Gtk.Window):
+    def __init__(self, data_file=None, started=None, instrument=False):
+        Gtk.Window.__init__(self)
+        # Start with an empty placeholder, the data file is parsed in the background
+        YearProgressRenderer.__init__(self, data_file, load=False)
+
+        self.cursor_blink_timer = None
+
+        # Hover changes damage only the nodes involved
+        self.scene.invalidate = self.redraw
+        # What a click on each node does, given the node's hit detail
+        self.click_actions = {
+            'days': self.open_day_view,
+            'hearts': self.toggle_resolution,
+            'settings_button': lambda detail: self.open_settings(),
+            'decade_button': lambda detail: self.open_decade_view(),
+            'filter_button': lambda detail: self.cycle_category_filter(),
+            'close_button': lambda detail: self.close_settings(),
+            'conflict_note': lambda detail: self.dismiss_conflict(),
+            'back_button': lambda detail: (self.close_day_view() if self.view_mode == 'day_view'
+                                           else self.close_decade_view()),
+        }
+
+        # Startup metrics, in ms since the process started the widget
+        self.started = started if started is not None else time.monotonic()
+        self.first_frame_ms = None
+        self.data_loaded_ms = None
+
+        # Opt-in frame instrumentation
+        self.frame_stats = None
+        window_height = HEIGHT
+        if instrument or instrumentation_enabled():
+            self.frame_stats = FrameStats('year_progress')
+            # The overlay gets its own strip below the panel, clear of every view
+            window_height += OVERLAY_HEIGHT + 10
+            GLib.timeout_add_seconds(1, self.refresh_overlay)
+            GLib.timeout_add_seconds(SUMMARY_INTERVAL, self.write_frame_summary)
+
+        # Window setup
+        self.set_title("Year Progress")
+        self.set_default_size(WIDTH, window_height)
+        self.set_decorated(False)
+        self.set_resizable(False)
+
+        # Set proper window role for i3 identification
+        self.set_role("desktop_widget")
+
+        # Make window transparent
+        screen = self.get_screen()
+        visual = screen.get_rgba_visual()
+        if visual and screen.is_composited():
+            self.set_visual(visual)
+
+        # Set window properties for desktop widget behavior
+        self.set_type_hint(Gdk.WindowTypeHint.DESKTOP)
+        self.set_keep_below(True)
+        self.stick()
+
+        # Make window click-through and prevent i3 tiling
+        self.set_accept_focus(False)
+        self.set_can_focus(False)
+        self.set_skip_taskbar_hint(True)
+        self.set_skip_pager_hint(True)
+
+        # Position window (centered)
+        display = Gdk.Display.get_default()
+        monitor = display.get_primary_monitor()
+        geometry = monitor.get_geometry()
+        screen_width = geometry.width
+        screen_height = geometry.height
+
+        x = (screen_width - WIDTH) // 2
+        y = (screen_height - window_height) // 2
+        self.move(x, y)
+
+        # Set up for transparency and drawing
+        self.set_app_paintable(True)
+        self.connect('screen-changed', self.on_screen_changed)
+        self.text.set_font_options(screen.get_font_options())
+        settings = Gtk.Settings.get_default()
+        settings.connect('notify::gtk-xft-dpi', self.on_font_settings_changed)
+        settings.connect('notify::gtk-xft-antialias', self.on_font_settings_changed)
+        settings.connect('notify::gtk-xft-hinting', self.on_font_settings_changed)
+
+        # Create drawing area
+        self.drawing_area = Gtk.DrawingArea()
+        # The only draw handler, so each expose is painted and counted once
+        self.drawing_area.connect('draw', self.on_draw)
+        self.drawing_area.add_events(Gdk.EventMask.POINTER_MOTION_MASK |
+                                     Gdk.EventMask.BUTTON_PRESS_MASK |
+                                     Gdk.EventMask.LEAVE_NOTIFY_MASK |
+                                     Gdk.EventMask.KEY_PRESS_MASK |
+                                     Gdk.EventMask.SCROLL_MASK)
+        self.drawing_area.connect('motion-notify-event', self.on_mouse_move)
+        self.drawing_area.connect('button-press-event', self.on_click)
+        self.drawing_area.connect('leave-notify-event', self.on_mouse_leave)
+        self.drawing_area.connect('key-press-event', self.on_key_press)
+        self.drawing_area.connect('scroll-event', self.on_scroll)
+        self.drawing_area.set_can_focus(True)
+        if self.frame_stats:
+            # The overlay is a separate area, so its own repaint is never a counted frame
+            self.drawing_area.set_size_request(WIDTH, HEIGHT)
+            self.overlay_area = Gtk.DrawingArea()
+            self.overlay_area.set_size_request(WIDTH, OVERLAY_HEIGHT + 10)
+            self.overlay_area.connect('draw', self.on_overlay_draw)
+            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+            box.pack_start(self.drawing_area, False, False, 0)
+            box.pack_start(self.overlay_area, False, False, 0)
+            self.add(box)
+        else:
+            self.add(self.drawing_area)
+
+        # Follow the wall-clock date across suspend, clock steps and timezone changes
+        self.day_scheduler = DayScheduler(self.on_new_day)
+        self.day_timer = None
+        self.day_alarm = WallClockAlarm()
+        if self.day_alarm.fileno() is not None:
+            GLib.io_add_watch(self.day_alarm.fileno(), GLib.PRIORITY_DEFAULT,
+                              GLib.IO_IN, self.on_day_alarm)
+        self.watch_clock_changes()
+        self.schedule_daily_update()
+
+        # Parse the data file off the main loop
+        self.reload_timer = None
+        self.control_socket = None
+        threading.Thread(target=self.load_data_in_background, daemon=True).start()
+
+    def on_screen_changed(self, widget, old_screen):
+        screen = self.get_screen()
+        visual = screen.get_rgba_visual()
+        if visual and screen.is_composited():
+            self.set_visual(visual)
+        self.text.set_font_options(screen.get_font_options())
+        self.scene.dirty()
+
+    def on_font_settings_changed(self, settings, param):
+        """Rebuild cached fonts after a DPI or font rendering change"""
+        self.text.set_font_options(self.get_screen().get_font_options())
+        self.text.clear()
+        self.scene.dirty()
+        self.redraw('font')
+
+    def load_data_in_background(self):
+        """Read and validate the data file in a worker thread"""
+        parsed = self.parse_data()
+        GLib.idle_add(self.on_data_loaded, parsed)
+
+    def on_data_loaded(self, parsed):
+        """Swap in the loaded data on the main loop"""
+        self.apply_data(parsed)
+        self.data_loaded_ms = (time.monotonic() - self.started) * 1000
+        self.redraw('data-loaded')
+
+        # Pick up edits made to the data file by other programs
+        self.file_monitor = Gio.File.new_for_path(self.data_file).monitor_file(
+            Gio.FileMonitorFlags.NONE, None)
+        self.file_monitor.connect('changed', self.on_data_file_changed)
+
+        # Listen for toggle/status requests from keybindings
+        self.control_socket = create_server_socket()
+        if self.control_socket:
+            GLib.io_add_watch(self.control_socket.fileno(), GLib.PRIORITY_DEFAULT,
+                              GLib.IO_IN, self.on_control_request)
+            self.connect('destroy', self.on_destroy)
+        return False
+
+    def get_status(self):
+        """Get status for the control socket, including startup metrics"""
+        status = super().get_status()
+        status['startup'] = {
+            'first_frame_ms': self.first_frame_ms,
+            'data_loaded_ms': self.data_loaded_ms,
+        }
+        return status
+
+    def on_control_request(self, fd, condition):
+        """Answer a client on the control socket"""
+        if serve_request(self.control_socket, self):
+            self.redraw('control')
+        return True
+
+    def on_data_file_changed(self, monitor, file, other_file, event_type):
+        """Schedule a reload when the data file is replaced or rewritten"""
+        if event_type not in (Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+                              Gio.FileMonitorEvent.CREATED,
+                              Gio.FileMonitorEvent.MOVED_IN,
+                              Gio.FileMonitorEvent.RENAMED):
+            return
+        # Coalesce the burst of events a single write produces
+        if self.reload_timer is None:
+            self.reload_timer = GLib.timeout_add(100, self.reload_external_changes)
+
+    def reload_external_changes(self):
+        """Merge external edits of the data file and redraw what they touch"""
+        self.reload_timer = None
+        # Our own saves update the signature, so they are skipped here
+        if not self.has_external_changes():
+            return False
+
+        with self.locked():
+            changed_keys, resolutions_changed, conflict = self.merge_external_changes()
+
+        if self.view_mode == 'settings' and resolutions_changed:
+            if self.editor.get_text() == self.editor_base:
+                # Show the new list in an untouched editor, closing it must not write the old one back
+                self.editor_base = self.get_editor_text()
+                self.editor.set_text(self.editor_base)
+                self.editor_layout.clear()
+                self.scroll_to_cursor()
+            else:
+                # Keep the typing, closing the editor copies the disk version aside
+                self.editor_stale = True
+
+        if resolutions_changed or conflict:
+            self.redraw('external-edit')
+        elif self.view_mode == 'main' and changed_keys:
+            if self.get_filter() is not None:
+                # Filtered dots are shaded by each day's completions, rebuild them
+                self.year_grid.bits_key = None
+                self.redraw('external-edit', GRID_RECT)
+            if self.get_today_key() in changed_keys:
+                self.redraw('external-edit', self.get_hearts_rect())
+        elif self.view_mode == 'day_view' and self.get_day_key(self.viewing_day) in changed_keys:
+            self.redraw('external-edit', self.get_day_view_list_rect())
+        elif self.view_mode == 'decade' and changed_keys:
+            self.redraw('external-edit')
+        return False
+
+    def on_destroy(self, widget):
+        """Remove the control socket, then give up its lock"""
+        self.control_socket.close()
+
+    def on_mouse_move(self, widget, event):
+        """Handle mouse movement, redrawing only the areas whose hover changed"""
+        self.update_scene()
+        self.scene.update_hover(event.x, event.y)
+
+    def on_mouse_leave(self, widget, event):
+        """Handle mouse leaving widget"""
+        self.scene.set_hover(None)
+
+    def on_click(self, widget, event):
+        """Run the click action of the node under the pointer"""
+        if not self.data_loaded:
+            # Edits of the startup placeholder would be lost when the data arrives
+            return False
+        name, detail = self.hit_test(event.x, event.y)
+        if name == 'text_box':
+            # Click in text area to focus
+            self.drawing_area.grab_focus()
+            # Place the cursor from the cached line layout
+            self.editor.move_to(*self.editor_position_at(event.x, event.y))
+            self.cursor_visible = True
+            self.redraw('edit', self.get_text_box_rect())
+            return True
+
+        action = self.click_actions.get(name)
+        if action is None:
+            return False
+        action(detail)
+        return True
+
+    def toggle_resolution(self, index):
+        """Toggle completion status of a resolution"""
+        if self.view_mode == 'day_view':
+            # Toggle for the day being viewed
+            completions = self.get_day_completions(self.viewing_day)
+        else:
+            # Toggle for today (main view)
+            completions = self.get_today_completions()
+
+        if index < len(completions):
+            completions[index] = not completions[index]
+            self.save_data()
+            self.redraw('toggle')
+
+    def dismiss_conflict(self):
+        """Hide the conflict note, the disk version stays in the .conflict file"""
+        self.conflict_file = None
+        self.redraw('conflict', self.get_conflict_note_rect())
+
+    def get_editor_text(self):
+        """Get the resolutions as editor text, one "Name #category" per line"""
+        return '\n'.join(format_resolution_line(name, self.categories.get(name))
+                         for name in self.resolutions)
+
+    def open_settings(self):
+        """Switch to settings view"""
+        self.view_mode = 'settings'
+        self.editor_base = self.get_editor_text()
+        self.editor_stale = False
+        self.editor.set_text(self.editor_base)
+        self.editor_layout.clear()
+        self.scroll_top = 0
+        self.scroll_to_cursor()
+        self.cursor_visible = True
+        self.start_cursor_blink()
+        # Enable keyboard input
+        self.set_accept_focus(True)
+        self.set_can_focus(True)
+        self.drawing_area.grab_focus()
+        self.redraw('view')
+
+    def close_settings(self):
+        """Save settings and return to main view"""
+        # Parse resolutions from text
+        entries = [parse_resolution_line(line) for line in self.editor.lines if line.strip()]
+        if entries and self.editor.get_text() != self.editor_base:
+            disk = self.read_data_file() if self.editor_stale else None
+            if disk is not None:
+                # Our edits replace a list changed on disk while the editor was open
+                self.save_conflict(disk)
+            old_count = len(self.resolutions)
+            new_count = len(entries)
+            self.resolutions = [name for name, _ in entries]
+            self.categories = {name: category for name, category in entries if category}
+
+            # Only reset today's completions if count changed
+            if old_count != new_count:
+                key = self.get_today_key()
+                # Preserve existing completions, add False for new ones
+                if key in self.completions:
+                    existing = self.completions[key][:new_count]
+                    while len(existing) < new_count:
+                        existing.append(False)
+                    self.completions[key] = existing
+                else:
+                    self.completions[key] = [False] * new_count
+
+            self.save_data()
+
+        self.view_mode = 'main'
+        self.stop_cursor_blink()
+        # Disable keyboard input
+        self.set_accept_focus(False)
+        self.set_can_focus(False)
+        self.redraw('view')
+
+    def open_day_view(self, day_num):
+        """Open day view for a specific day"""
+        self.viewing_day = day_num
+        self.view_mode = 'day_view'
+        self.redraw('view')
+
+    def close_day_view(self):
+        """Close day view and return to main"""
+        self.viewing_day = None
+        self.view_mode = 'main'
+        self.redraw('view')
+
+    def open_decade_view(self):
+        """Switch to the multi-year view"""
+        self.view_mode = 'decade'
+        self.redraw('view')
+
+    def close_decade_view(self):
+        self.view_mode = 'main'
+        self.redraw('view')
+
+    def cycle_category_filter(self):
+        super().cycle_category_filter()
+        self.redraw('filter')
+
+    def on_key_press(self, widget, event):
+        """Handle keyboard input in settings mode"""
+        if self.view_mode != 'settings':
+            return False
+
+        keyval = event.keyval
+        keyname = Gdk.keyval_name(keyval)
+        ctrl = event.state & Gdk.ModifierType.CONTROL_MASK
+        editor = self.editor
+
+        # Handle special keys
+        if keyname == 'BackSpace':
+            if ctrl:
+                editor.delete_word_left()
+            else:
+                editor.backspace()
+        elif keyname == 'Delete':
+            editor.delete()
+        elif keyname == 'Left':
+            if ctrl:
+                editor.move_word_left()
+            else:
+                editor.move_left()
+        elif keyname == 'Right':
+            if ctrl:
+                editor.move_word_right()
+            else:
+                editor.move_right()
+        elif keyname == 'Up':
+            editor.move_up()
+        elif keyname == 'Down':
+            editor.move_down()
+        elif keyname == 'Home':
+            # Go to start of current line
+            editor.move_home()
+        elif keyname == 'End':
+            # Go to end of current line
+            editor.move_end()
+        elif keyname == 'Return' or keyname == 'KP_Enter':
+            # Insert newline
+            editor.newline()
+        elif keyname == 'Escape':
+            self.close_settings()
+            return True
+        elif ctrl:
+            return True
+        elif len(keyname) == 1 or keyname == 'space':
+            # Regular character input
+            editor.insert(event.string if event.string else ' ')
+
+        self.scroll_to_cursor()
+
+        # Reset cursor blink
+        self.cursor_visible = True
+        self.redraw('edit', self.get_text_box_rect())
+        return True
+
+    def on_scroll(self, widget, event):
+        """Scroll the resolution editor"""
+        if self.view_mode != 'settings':
+            return False
+
+        if event.direction == Gdk.ScrollDirection.UP:
+            self.scroll_by(-1)
+        elif event.direction == Gdk.ScrollDirection.DOWN:
+            self.scroll_by(1)
+        elif event.direction == Gdk.ScrollDirection.SMOOTH:
+            self.scroll_by(round(event.delta_y))
+        self.redraw('scroll', self.get_text_box_rect())
+        return True
+
+    def start_cursor_blink(self):
+        """Start cursor blinking timer"""
+        if self.cursor_blink_timer:
+            GLib.source_remove(self.cursor_blink_timer)
+        self.cursor_blink_timer = GLib.timeout_add(500, self.blink_cursor)
+
+    def stop_cursor_blink(self):
+        """Stop cursor blinking timer"""
+        if self.cursor_blink_timer:
+            GLib.source_remove(self.cursor_blink_timer)
+            self.cursor_blink_timer = None
+
+    def blink_cursor(self):
+        """Toggle cursor visibility"""
+        self.cursor_visible = not self.cursor_visible
+        # Only the cursor changes, its position comes from the cached layout
+        self.redraw('blink', self.get_cursor_rect())
+        return True
+
+    def redraw(self, cause, rect=None):
+        """Queue a redraw of the window or of one area, noting the cause"""
+        if self.frame_stats:
+            self.frame_stats.note_cause(cause)
+        if rect:
+            self.queue_draw_area(*rect)
+        else:
+            self.queue_draw()
+
+    def refresh_overlay(self):
+        """Update the instrumentation overlay once a second"""
+        self.overlay_area.queue_draw()
+        return True
+
+    def on_overlay_draw(self, widget, cr):
+        """Draw the instrumentation overlay, outside the measured frames"""
+        cr.set_source_rgba(0, 0, 0, 0)
+        cr.set_operator(cairo.OPERATOR_SOURCE)
+        cr.paint()
+        draw_overlay(cr, self.frame_stats, 10, 0)
+        return False
+
+    def write_frame_summary(self):
+        """Append a frame summary to the log"""
+        self.frame_stats.write_summary()
+        return True
+
+    def on_draw(self, widget, cr):
+        """Draw the widget"""
+        if self.frame_stats:
+            start = time.perf_counter()
+            self.draw(cr)
+            self.frame_stats.frame((time.perf_counter() - start) * 1000, damage_area(cr))
+        else:
+            self.draw(cr)
+        if self.first_frame_ms is None:
+            self.first_frame_ms = (time.monotonic() - self.started) * 1000
+        return False
+
+    def watch_clock_changes(self):
+        """Re-check the date on resume and when the timezone changes"""
+        try:
+            self.localtime_monitor = Gio.File.new_for_path(LOCALTIME).monitor_file(
+                Gio.FileMonitorFlags.NONE, None)
+            self.localtime_monitor.connect('changed', self.on_timezone_changed)
+        except GLib.Error:
+            self.localtime_monitor = None
+
+        try:
+            self.system_bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+            self.system_bus.signal_subscribe('org.freedesktop.login1',
+                                             'org.freedesktop.login1.Manager',
+                                             'PrepareForSleep', '/org/freedesktop/login1',
+                                             None, Gio.DBusSignalFlags.NONE,
+                                             self.on_prepare_for_sleep)
+        except GLib.Error:
+            # No system bus, the alarm and the periodic check still catch up
+            self.system_bus = None
+
+    def on_prepare_for_sleep(self, connection, sender, path, interface, signal, parameters):
+        """Catch up with the date as soon as the system resumes"""
+        going_to_sleep, = parameters.unpack()
+        if not going_to_sleep:
+            self.check_day()
+
+    def on_timezone_changed(self, monitor, file, other_file, event_type):
+        time.tzset()
+        self.check_day()
+
+    def on_day_alarm(self, fd, condition):
+        """Wall-clock midnight passed or the clock was set"""
+        self.day_alarm.acknowledge()
+        self.check_day()
+        return True
+
+    def check_day(self):
+        """Re-check the date and re-arm the midnight wakeups"""
+        self.day_scheduler.check()
+        self.schedule_daily_update()
+
+    def on_new_day(self, old_date, new_date):
+        super().on_new_day(old_date, new_date)
+        # Nothing in the settings view depends on the date
+        if self.view_mode != 'settings':
+            self.redraw('midnight')
+
+    def schedule_daily_update(self):
+        """Arm the wakeups for the next midnight"""
+        if self.day_timer is not None:
+            GLib.source_remove(self.day_timer)
+        # Monotonic fallback, capped so a missed wakeup is caught within MAX_SLEEP
+        self.day_timer = GLib.timeout_add_seconds(self.day_scheduler.seconds_until_check(),
+                                                  self.daily_update)
+        self.day_alarm.arm_at(next_midnight(datetime.datetime.now()))
+
+    def daily_update(self):
+        """Periodic date check"""
+        self.day_timer = None
+        self.check_day()
+        return False
+
+
+def create_window(data_file=None, started=None, instrument=False):
+    """Create and show the widget window, for main() or the widget host"""
+    win = YearProgressWidget(data_file, started, instrument)
+    win.show_all()
+
+    # Make window click-through by setting input region to empty
+    window = win.get_window()
+    if window:
+        window.set_role("year_progress_widget")
+    return win
+
+
+def main(data_file=None, started=None, instrument=False):
+    win = create_window(data_file, started, instrument)
+    win.connect('destroy', Gtk.main_quit)
+    Gtk.main()
@@ -1,15 +1,278 @@
+"""
+List the images under a directory
+Streams paths as they are found, for rofi or fzf. Images are recognised by
+their first bytes, not their extension, and sized from their headers
+
+Usage:
+    python3 list_images.py [DIR]               one path per line, relative to DIR (default .)
+    python3 list_images.py -0                  NUL-separated, for fzf --read0 or xargs -0
+    python3 list_images.py --json              one JSON object per line, with format and size
+    python3 list_images.py --min-size 2560x1440   only images at least this large
+"""
+
+import argparse
+import json
 import os
+import struct
+import sys
+
+HEADER_BYTES = 512  # One read holds most headers, JPEG and AVIF ones after large metadata aside
+MAX_PROPERTIES_BYTES = 1 << 16  # Largest AVIF item property box read looking for the size
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+BMP_HEADER_SIZES = {12, 40, 52, 56, 64, 108, 124}
+AVIF_BRANDS = {b'avif', b'avis'}
+# Start of frame markers, carrying the image size; C4, C8 and CC are other segments
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(f, head):
+    """Follow the JPEG segments to the first start of frame
+
+    Usually it is within the first read; after large EXIF data only the
+    segment headers are read, skipping the metadata itself.
+    """
+    offset = 2
+    while True:
+        segment = head[offset:offset + 9]
+        if len(segment) < 9:
+            f.seek(offset)
+            segment = f.read(9)
+        if len(segment) < 4 or segment[0] != 0xFF:
+            return None
+        marker = segment[1]
+        if marker == 0xFF:
+            # Fill byte
+            offset += 1
+        elif marker in JPEG_SOF_MARKERS:
+            if len(segment) < 9:
+                return None
+            height, width = struct.unpack_from('>HH', segment, 5)
+            return width, height
+        elif marker in (0xD9, 0xDA):
+            # End of image or scan data before any frame
+            return None
+        elif marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            # Markers without a length
+            offset += 2
+        else:
+            offset += 2 + struct.unpack_from('>H', segment, 2)[0]
+
+
+def iter_boxes(f, start, end=None):
+    """Yield (type, payload offset, end offset) of the ISO-BMFF boxes from start to end
+
+    Only the box headers are read. end is None for a box running to the end
+    of the file.
+    """
+    offset = start
+    while end is None or offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(16)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack_from('>I4s', header)
+        payload = offset + 8
+        if size == 1:
+            # 64-bit size
+            if len(header) < 16:
+                return
+            size = struct.unpack_from('>Q', header, 8)[0]
+            payload += 8
+        elif size == 0:
+            yield box_type, payload, end
+            return
+        if size < payload - offset:
+            return
+        yield box_type, payload, offset + size
+        offset += size
+
+
+def largest_ispe(data):
+    """Get the largest image spatial extent ('ispe') property in a buffer
+
+    The primary image is the largest one, grid tiles and alpha or
+    thumbnail items are never bigger.
+    """
+    best = None
+    i = data.find(b'ispe')
+    while i != -1 and i + 16 <= len(data):
+        width, height = struct.unpack_from('>II', data, i + 8)
+        if best is None or width * height > best[0] * best[1]:
+            best = (width, height)
+        i = data.find(b'ispe', i + 4)
+    return best
+
+
+def avif_size(f):
+    """Get the size from the item properties, following the boxes to meta/iprp
+
+    Only the box headers and the properties box itself are read, wherever
+    a large meta box puts them.
+    """
+    for box_type, payload, end in iter_boxes(f, 0):
+        if box_type == b'meta':
+            # A full box, version and flags come before the children
+            for child_type, child_payload, child_end in iter_boxes(f, payload + 4, end):
+                if child_type == b'iprp':
+                    if child_end is None or child_end - child_payload > MAX_PROPERTIES_BYTES:
+                        return None
+                    f.seek(child_payload)
+                    return largest_ispe(f.read(child_end - child_payload))
+            return None
+        if box_type == b'mdat':
+            # Image data before any metadata
+            return None
+    return None
+
+
+def identify(f):
+    """Get (format, width, height) of an open file, or None if it is not an image
+
+    width and height are None if the header is cut short.
+    """
+    head = f.read(HEADER_BYTES)
+    size = None
+    if head.startswith(PNG_SIGNATURE) and head[12:16] == b'IHDR':
+        image_format = 'png'
+        if len(head) >= 24:
+            size = struct.unpack_from('>II', head, 16)
+    elif head.startswith(b'\xff\xd8\xff'):
+        image_format = 'jpeg'
+        size = jpeg_size(f, head)
+    elif head[:6] in (b'GIF87a', b'GIF89a'):
+        image_format = 'gif'
+        if len(head) >= 10:
+            size = struct.unpack_from('<HH', head, 6)
+    elif head.startswith(b'BM') and len(head) >= 26 and \
+            struct.unpack_from('<I', head, 14)[0] in BMP_HEADER_SIZES:
+        image_format = 'bmp'
+        if struct.unpack_from('<I', head, 14)[0] == 12:
+            size = struct.unpack_from('<HH', head, 18)
+        else:
+            width, height = struct.unpack_from('<ii', head, 18)
+            # Negative heights mean top-down rows
+            size = (width, abs(height))
+    elif head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        image_format = 'webp'
+        chunk = head[12:16]
+        if chunk == b'VP8 ' and len(head) >= 30 and head[23:26] == b'\x9d\x01\x2a':
+            width, height = struct.unpack_from('<HH', head, 26)
+            size = (width & 0x3FFF, height & 0x3FFF)
+        elif chunk == b'VP8L' and len(head) >= 25 and head[20] == 0x2F:
+            bits = struct.unpack_from('<I', head, 21)[0]
+            size = ((bits & 0x3FFF) + 1, (bits >> 14 & 0x3FFF) + 1)
+        elif chunk == b'VP8X' and len(head) >= 30:
+            size = (int.from_bytes(head[24:27], 'little') + 1,
+                    int.from_bytes(head[27:30], 'little') + 1)
+    elif head[4:8] == b'ftyp' and len(head) >= 16:
+        box_end = min(struct.unpack_from('>I', head)[0], len(head))
+        brands = {head[8:12]} | {head[i:i + 4] for i in range(16, box_end - 3, 4)}
+        if not brands & AVIF_BRANDS:
+            return None
+        image_format = 'avif'
+        size = avif_size(f)
+    else:
+        return None
+
+    width, height = size if size else (None, None)
+    return image_format, width, height
+
+
+def walk_files(top):
+    """Yield (relative path, DirEntry) of every file under a directory as it is found
+
+    Directories are walked depth first with an explicit stack. The entry
+    types come from the directory listing itself, so files and directories
+    are told apart without a stat call, except for symlinks. Symlinked
+    directories and hidden ones are not entered.
+    """
+    stack = [(top, '')]
+    while stack:
+        path, prefix = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                subdirs = []
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            subdirs.append((entry.path, prefix + entry.name + os.sep))
+                    elif entry.is_file():
+                        yield prefix + entry.name, entry
+        except OSError as e:
+            print(f"Skipping {path}: {e.strerror}", file=sys.stderr)
+            continue
+        # Visit subdirectories in listing order
+        stack.extend(reversed(subdirs))
+
+
+def scan_images(top, min_size=None):
+    """Yield (relative path, DirEntry, (format, width, height)) of every image under a directory
+
+    Each file is opened once, unbuffered, for a single small read, see
+    identify(). Files that cannot be read or whose header is malformed are
+    skipped with a note. With min_size, images smaller than (width, height)
+    or of unknown size are left out.
+    """
+    for path, entry in walk_files(top):
+        try:
+            # Unbuffered, so only HEADER_BYTES are read rather than a whole buffer
+            with open(entry.path, 'rb', buffering=0) as f:
+                info = identify(f)
+        except OSError as e:
+            print(f"Skipping {path}: {e.strerror}", file=sys.stderr)
+            continue
+        except (struct.error, ValueError) as e:
+            print(f"Skipping {path}: malformed header ({e})", file=sys.stderr)
+            continue
+        if info is None:
+            continue
+        if min_size:
+            _, width, height = info
+            if width is None or width < min_size[0] or height < min_size[1]:
+                continue
+        yield path, entry, info
+
+
+def parse_size(text):
+    """Parse WIDTHxHEIGHT, e.g. 1920x1080"""
+    try:
+        width, height = (int(n) for n in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    return width, height
+
+
+def format_record(path, entry, info, mode):
+    if mode == 'json':
+        image_format, width, height = info
+        return json.dumps({'path': path, 'name': entry.name, 'format': image_format,
+                           'width': width, 'height': height}) + '\n'
+    return path + ('\0' if mode == 'nul' else '\n')
 
-# Define image file extensions you want to list
-image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.gif'}
 
-# Get all files in current directory
-files = os.listdir('.')
+def main():
+    parser = argparse.ArgumentParser(description="List the images under a directory")
+    parser.add_argument('directory', nargs='?', default='.', help="where to look (default: .)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('-0', '--null', dest='mode', action='store_const', const='nul',
+                        help="end each path with NUL instead of a newline")
+    output.add_argument('--json', dest='mode', action='store_const', const='json',
+                        help="print one JSON object per line")
+    parser.add_argument('--min-size', type=parse_size, metavar='WxH',
+                        help="only list images at least this large, e.g. your monitor's resolution")
+    args = parser.parse_args()
 
-# Filter files to only images
-image_files = [f for f in files if os.path.splitext(f)[1].lower() in image_extensions]
+    try:
+        for path, entry, info in scan_images(args.directory, args.min_size):
+            sys.stdout.write(format_record(path, entry, info, args.mode))
+            # Let the picker show results while the walk goes on
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # The picker quit before the listing ended
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        sys.exit(130)
 
-# Print the image file names
-for img in image_files:
-    print(img)
 
+if __name__ == '__main__':
+    main()